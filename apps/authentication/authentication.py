@@ -0,0 +1,113 @@
+from django.utils.translation import gettext_lazy as _
+
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.authentication import caching, revocation
+from apps.authentication.models import User
+from apps.profiles.models import Profile
+
+
+class ProfileTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication loading the user and profile with the token, or
+    from the cache.
+    """
+
+    def authenticate_credentials(self, key):
+        user, token = caching.get_token(key)
+        if user is None:
+            raise AuthenticationFailed(_("Invalid token."))
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User inactive or deleted."))
+
+        return user, token
+
+
+class ProfileJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication loading the user and profile in one query, or from
+    the cache.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+
+        user = caching.get_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            )
+
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+
+        self.check_revoked(user, validated_token)
+        return user
+
+    def check_revoked(self, user, validated_token):
+        """
+        With CHECK_REVOKE_TOKEN, reject tokens issued before the user's
+        password changed.
+        """
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != caching.password_hash(user):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."),
+                code="password_changed"
+            )
+
+
+class StatelessJWTAuthentication(ProfileJWTAuthentication):
+    """
+    Builds the user and profile from the claims ProfileTokenObtainPair
+    Serializer adds, without a query, unless the token is revoked. Other
+    user and profile fields load from the database when first read.
+    Tokens issued without the claims load the user as before.
+    """
+
+    def get_user(self, validated_token):
+        if revocation.is_revoked(validated_token):
+            raise AuthenticationFailed(
+                _("Token has been revoked"), code="token_revoked"
+            )
+        if "profile_id" not in validated_token:
+            return super().get_user(validated_token)
+
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        user = User.from_db(
+            User.objects.db,
+            ["id", "is_active", "is_staff"],
+            [user_id, True, validated_token["is_staff"]]
+        )
+        fields = {"id": validated_token["profile_id"], "user_id": user_id}
+        if "timezone" in validated_token:
+            # votes and most_voted are dated in it
+            fields["timezone"] = validated_token["timezone"]
+        user.profile = Profile.from_db(
+            Profile.objects.db, list(fields), list(fields.values())
+        )
+        return user
+
+
+class ProfileJWTScheme(SimpleJWTScheme):
+    """
+    Documents ProfileJWTAuthentication and its subclasses as the JWT scheme
+    they extend.
+    """
+
+    target_class = "apps.authentication.authentication.ProfileJWTAuthentication"
+    match_subclasses = True
@@ -0,0 +1,140 @@
+"""
+Users resolved for authentication, with their profile.
+
+A user is loaded together with its profile in one query. With
+AUTH_USER_CACHE_TIMEOUT set, the pair is also cached in Redis by user id,
+and token keys by the id of their user, until a save or delete of the
+user, profile or token drops them.
+
+Cached users leave out their password hash and keep only the md5 of it
+that simplejwt's CHECK_REVOKE_TOKEN compares with. Cached profiles leave
+out daily_votes, which votes change with raw SQL,
+so it is read from the database with a fresh votes_date when needed. The
+cached votes_date can only be behind, which at worst makes a vote look up
+USER_DAILY_VOTES it did not need.
+"""
+from typing import Dict, Optional, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+
+from rest_framework.authtoken.models import Token
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+# Profile fields votes update without saving the profile
+VOLATILE_PROFILE_FIELDS = ("daily_votes",)
+
+
+def user_key(user_id) -> str:
+    return f"auth:user:{user_id}"
+
+
+def token_key(key: str) -> str:
+    return f"auth:token:{key}"
+
+
+def timeout() -> Optional[int]:
+    return settings.AUTH_USER_CACHE_TIMEOUT
+
+
+def field_values(instance: models.Model, exclude=()) -> Dict:
+    return {
+        field.attname: getattr(instance, field.attname)
+        for field in instance._meta.concrete_fields
+        if field.attname not in exclude
+    }
+
+
+def password_hash(user) -> str:
+    """
+    md5 of the user's password hash, without loading the password of a
+    cached user.
+    """
+    cached = getattr(user, "cached_password_hash", None)
+    return cached or get_md5_hash_password(user.password)
+
+
+def from_values(model, values: Dict) -> models.Model:
+    return model.from_db(
+        model.objects.db, list(values), list(values.values())
+    )
+
+
+def cache_user(user):
+    """
+    Cache user and its profile without the password hash and the
+    profile's volatile fields.
+    """
+    profile = getattr(user, "profile", None)
+    cache.set(
+        user_key(user.pk),
+        {
+            "user": field_values(user, ("password",)),
+            "password_hash": password_hash(user),
+            "profile": profile and field_values(
+                profile, VOLATILE_PROFILE_FIELDS
+            ),
+        },
+        timeout()
+    )
+
+
+def cached_user(user_id):
+    entry = cache.get(user_key(user_id))
+    if entry is None:
+        return None
+
+    user = from_values(apps.get_model(settings.AUTH_USER_MODEL), entry["user"])
+    user.cached_password_hash = entry.get("password_hash")
+    if entry["profile"] is not None:
+        user.profile = from_values(
+            apps.get_model("profiles.Profile"), entry["profile"]
+        )
+    return user
+
+
+def get_user(user_id):
+    """
+    Active or inactive user with its profile, None when there is none.
+    """
+    user = cached_user(user_id) if timeout() else None
+    if user is None:
+        user = apps.get_model(settings.AUTH_USER_MODEL).objects.select_related(
+            "profile"
+        ).filter(pk=user_id).first()
+        if user is not None and timeout():
+            cache_user(user)
+    return user
+
+
+def get_token(key: str) -> Tuple[Optional[models.Model], Optional[Token]]:
+    """
+    The user, with its profile, and the token for an API token key.
+    """
+    user_id = cache.get(token_key(key)) if timeout() else None
+    user = get_user(user_id) if user_id is not None else None
+    if user is not None:
+        return user, Token.from_db(
+            Token.objects.db, ["key", "user_id"], [key, user_id]
+        )
+
+    token = Token.objects.select_related("user__profile").filter(
+        key=key
+    ).first()
+    if token is None:
+        return None, None
+    if timeout():
+        cache.set(token_key(key), token.user_id, timeout())
+        cache_user(token.user)
+    return token.user, token
+
+
+def invalidate_user(user_id):
+    cache.delete(user_key(user_id))
+
+
+def invalidate_token(key: str):
+    cache.delete(token_key(key))
@@ -0,0 +1,44 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.authentication.models import User
+from apps.authentication.serializers import ProvisionedUserSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users, their profiles and email addresses in bulk from a "
+        "CSV file with an email column and optional username, first_name "
+        "and last_name columns"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("file")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows per INSERT",
+        )
+
+    def handle(self, *args, **options):
+        with open(options["file"], encoding="utf-8", newline="") as file:
+            serializer = ProvisionedUserSerializer(
+                data=list(csv.DictReader(file)), many=True
+            )
+        if not serializer.is_valid():
+            # data rows start on line 2, after the header
+            raise CommandError("\n".join(
+                f"line {line}: {errors}"
+                for line, errors in enumerate(serializer.errors, 2)
+                if errors
+            ))
+
+        report = User.objects.provision(
+            serializer.validated_data, options["batch_size"]
+        )
+        if options["verbosity"]:
+            self.stdout.write(
+                "Created {created} users, skipped {skipped}".format(**report)
+            )
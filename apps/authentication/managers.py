@@ -0,0 +1,96 @@
+from typing import Dict, Iterable, List
+from zoneinfo import ZoneInfo
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import UserManager as DjangoUserManager
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from allauth.account.models import EmailAddress
+
+from apps.utils.helper import get_config_value
+
+
+class UserManager(DjangoUserManager):
+    # Lookups and INSERTs a provision makes before giving up on signups
+    # that keep taking its emails or usernames in between
+    PROVISION_ATTEMPTS = 3
+
+    def untaken(self, users: List[Dict]) -> List:
+        """
+        Unsaved users for the rows whose email, ignoring case, and username
+        are neither taken nor repeated by an earlier row.
+        """
+        emails = {user["email"].lower() for user in users}
+        # derived usernames are the normalized email the rows are saved with
+        usernames = {
+            user.get("username") or self.normalize_email(user["email"])
+            for user in users
+        }
+        taken = self.annotate(lower_email=Lower("email")).filter(
+            Q(lower_email__in=emails) | Q(username__in=usernames)
+        ).values_list("lower_email", "username")
+        seen = {value for pair in taken for value in pair}
+
+        new = []
+        for user in users:
+            email = self.normalize_email(user["email"])
+            username = user.get("username") or email
+            if email.lower() in seen or username in seen:
+                continue
+            seen.update((email.lower(), username))
+            new.append(self.model(
+                username=username,
+                email=email,
+                first_name=user.get("first_name", ""),
+                last_name=user.get("last_name", ""),
+            ))
+        return new
+
+    def provision(self, users: Iterable[Dict], batch_size=1000) -> Dict:
+        """
+        Create users with unusable passwords, their profiles and primary
+        email addresses in bulk INSERTs, instead of a save and its signals
+        per user. Rows whose email or username is taken are skipped, also
+        when a signup takes it between the lookup and the INSERTs.
+        """
+        users = list(users)
+        for attempt in range(1, self.PROVISION_ATTEMPTS + 1):
+            new = self.untaken(users)
+            try:
+                self.create_provisioned(new, batch_size)
+                break
+            except IntegrityError:
+                # taken by a signup since the lookup, look them up again
+                if attempt == self.PROVISION_ATTEMPTS:
+                    raise
+        return {"created": len(new), "skipped": len(users) - len(new)}
+
+    def create_provisioned(self, new: List, batch_size: int):
+        for user in new:
+            user.set_unusable_password()
+
+        profile = apps.get_model("profiles.Profile")
+        daily_votes = get_config_value("USER_DAILY_VOTES")
+        today = timezone.localdate(timezone=ZoneInfo(settings.TIME_ZONE))
+        with transaction.atomic():
+            self.bulk_create(new, batch_size=batch_size)
+            profile.objects.bulk_create(
+                [
+                    profile(user=user, daily_votes=daily_votes,
+                            votes_date=today)
+                    for user in new
+                ],
+                batch_size=batch_size
+            )
+            EmailAddress.objects.bulk_create(
+                [
+                    EmailAddress(user=user, email=user.email.lower(),
+                                 primary=True, verified=False)
+                    for user in new
+                ],
+                batch_size=batch_size
+            )
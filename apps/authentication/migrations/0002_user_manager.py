@@ -0,0 +1,20 @@
+# Generated by Django 5.1 on 2026-10-18 14:06
+
+import apps.authentication.managers
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', apps.authentication.managers.UserManager()),
+            ],
+        ),
+    ]
@@ -1,14 +1,20 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
 from django.db.models.functions import Lower
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
 from allauth.account.models import EmailAddress
+from rest_framework.authtoken.models import Token
+
+from apps.authentication import caching, revocation
+from apps.authentication.managers import UserManager
 
 
 class User(AbstractUser):
 
+    objects = UserManager()
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -29,3 +35,58 @@ def create_superuser_email_address(sender, instance: User, created, **kwargs):
             email=instance.email,
             defaults={'verified': instance.is_superuser, 'primary': True}
         )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance: User, **kwargs):
+    """
+    Drop the user cached for authentication once the write is committed.
+    """
+    pk = instance.pk
+    transaction.on_commit(lambda: caching.invalidate_user(pk))
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_token_cache(sender, instance: Token, **kwargs):
+    """
+    Forget the user of a deleted or replaced token.
+    """
+    key = instance.key
+    transaction.on_commit(lambda: caching.invalidate_token(key))
+
+
+# Changes to these revoke the user's JWTs
+REVOKING_FIELDS = ("is_active", "is_staff", "password")
+
+
+@receiver(pre_save, sender=User)
+def revoke_changed_user_tokens(sender, instance: User, **kwargs):
+    """
+    Revoke the JWTs of a user being deactivated, demoted or promoted, or
+    given a new password, as their claims or grants no longer hold.
+    """
+    update_fields = kwargs.get("update_fields")
+    if instance._state.adding or (
+        update_fields is not None
+        and not set(REVOKING_FIELDS) & set(update_fields)
+    ):
+        return
+
+    saved = User.objects.filter(pk=instance.pk).values(*REVOKING_FIELDS)
+    if any(
+        row[field] != getattr(instance, field)
+        for row in saved for field in REVOKING_FIELDS
+    ):
+        pk = instance.pk
+        transaction.on_commit(lambda: revocation.revoke_user(pk))
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user_tokens(sender, instance: User, **kwargs):
+    """
+    Revoke the JWTs of a deleted user.
+    """
+    pk = instance.pk
+    transaction.on_commit(lambda: revocation.revoke_user(pk))
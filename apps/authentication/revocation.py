@@ -0,0 +1,68 @@
+"""
+Revoked JWTs, for authentication and refreshes that trust their claims.
+
+A logout revokes its access and refresh tokens by jti until they expire.
+A user deactivated, deleted, demoted or given a new password has every
+token issued until then revoked, for as long as REFRESH_TOKEN_LIFETIME
+lets such tokens live.
+"""
+import time
+
+from django.core.cache import cache
+
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+
+# Claim holding time.time() when the token was issued, as iat holds only
+# whole seconds
+ISSUED_AT_CLAIM = "issued_at"
+
+def token_key(jti: str) -> str:
+    return f"auth:revoked:token:{jti}"
+
+
+def user_key(user_id) -> str:
+    return f"auth:revoked:user:{user_id}"
+
+
+def revoke_token(token: Token):
+    """
+    Reject token from now until it expires.
+    """
+    ttl = int(token["exp"] - time.time())
+    if ttl > 0:
+        cache.set(token_key(token[api_settings.JTI_CLAIM]), 1, ttl)
+
+
+def issued_at(token: Token) -> float:
+    """
+    When token was issued, to the sub-second from the ISSUED_AT_CLAIM
+    set_claims adds, else the whole second of its iat.
+    """
+    return token.get(ISSUED_AT_CLAIM, token.get("iat", 0))
+
+
+def revoke_user(user_id):
+    """
+    Reject the user's access and refresh tokens issued up to now.
+    """
+    cache.set(
+        user_key(user_id),
+        time.time(),
+        int(max(
+            api_settings.ACCESS_TOKEN_LIFETIME,
+            api_settings.REFRESH_TOKEN_LIFETIME
+        ).total_seconds())
+    )
+
+
+def is_revoked(token: Token) -> bool:
+    token_revoked = token_key(token[api_settings.JTI_CLAIM])
+    user_revoked = user_key(token[api_settings.USER_ID_CLAIM])
+    revoked = cache.get_many([token_revoked, user_revoked])
+    return token_revoked in revoked or (
+        user_revoked in revoked
+        # a login in the same second as the change is issued after it
+        and issued_at(token) < revoked[user_revoked]
+    )
@@ -0,0 +1,123 @@
+import time
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils.translation import gettext_lazy as _
+
+from dj_rest_auth.jwt_auth import CookieTokenRefreshSerializer
+from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.authentication import revocation
+
+
+class ProfileTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Adds the claims StatelessJWTAuthentication builds the user from.
+    Access tokens refreshed from the refresh token copy them.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        set_claims(token, user)
+        return token
+
+
+def set_claims(token, user):
+    token["profile_id"] = user.profile.pk
+    token["timezone"] = user.profile.timezone
+    token["is_staff"] = user.is_staff
+    token[revocation.ISSUED_AT_CLAIM] = time.time()
+
+
+class ProfileRefreshToken(RefreshToken):
+    """
+    Issues access tokens only to active users whose refresh token is not
+    revoked, with their current claims instead of the ones it was issued
+    with.
+    """
+
+    @property
+    def access_token(self):
+        from apps.authentication.models import User
+
+        user = User.objects.select_related("profile").filter(
+            pk=self[api_settings.USER_ID_CLAIM]
+        ).first()
+        if user is None or not user.is_active or revocation.is_revoked(self):
+            raise AuthenticationFailed(
+                _("Token has been revoked"), code="token_revoked"
+            )
+
+        # access tokens copy these, and so does a rotated refresh token
+        set_claims(self, user)
+        return super().access_token
+
+
+class ProfileTokenRefreshSerializer(CookieTokenRefreshSerializer):
+    token_class = ProfileRefreshToken
+
+
+class ProvisionedUserSerializer(serializers.Serializer):
+    USERNAME_MAX_LENGTH = 150
+
+    email = serializers.EmailField(max_length=254)
+    username = serializers.CharField(
+        max_length=USERNAME_MAX_LENGTH,
+        required=False,
+        help_text="defaults to the email"
+    )
+    first_name = serializers.CharField(
+        max_length=150, required=False, allow_blank=True
+    )
+    last_name = serializers.CharField(
+        max_length=150, required=False, allow_blank=True
+    )
+
+    def run_username_validators(self, value: str):
+        """
+        The User.username validators, bulk_create does not run them.
+        """
+        from apps.authentication.models import User
+
+        for validator in User._meta.get_field("username").validators:
+            validator(value)
+
+    def validate_username(self, value: str) -> str:
+        self.run_username_validators(value)
+        return value
+
+    def validate(self, attrs):
+        if "username" in attrs:
+            return attrs
+
+        if len(attrs["email"]) > self.USERNAME_MAX_LENGTH:
+            raise serializers.ValidationError({"username": _(
+                "Required for emails longer than {max_length} characters."
+            ).format(max_length=self.USERNAME_MAX_LENGTH)})
+        try:
+            self.run_username_validators(attrs["email"])
+        except DjangoValidationError:
+            raise serializers.ValidationError({"username": _(
+                "Required for emails that are not valid usernames."
+            )})
+        return attrs
+
+
+class UserProvisionSerializer(serializers.Serializer):
+    MAX_USERS = 10000
+
+    users = ProvisionedUserSerializer(
+        many=True, allow_empty=False, max_length=MAX_USERS
+    )
+
+
+class UserProvisionReportSerializer(serializers.Serializer):
+    created = serializers.IntegerField(read_only=True)
+    skipped = serializers.IntegerField(
+        read_only=True,
+        help_text="rows whose email or username is taken or repeated"
+    )
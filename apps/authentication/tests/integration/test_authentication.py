@@ -0,0 +1,296 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import override_settings
+
+from freezegun import freeze_time
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from apps.authentication import caching, revocation
+from apps.authentication.authentication import StatelessJWTAuthentication
+from apps.authentication.models import User
+from apps.authentication.tests.factory.user import UserFactory
+from apps.restaurants.tests.factory.restaurant import RestaurantFactory
+from apps.restaurants.views import RestaurantViewSet
+from apps.utils.tests.cases import BaseTestCase
+
+
+URL = "/api/restaurants"
+
+
+class AuthenticationTests(BaseTestCase):
+    """
+    Tests for the user and profile resolved by token and JWT authentication
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = UserFactory()
+        self.restaurant = RestaurantFactory(
+            name="Maxines", profile=self.user.profile
+        )
+        self.jwt = f"Bearer {RefreshToken.for_user(self.user).access_token}"
+        self.token = f"Token {Token.objects.create(user=self.user).key}"
+
+    def vote(self, authorization: str):
+        return self.api_client.post(
+            f"{URL}/{self.restaurant.pk}/vote",
+            HTTP_AUTHORIZATION=authorization
+        )
+
+    def test_vote_queries(self):
+        for authorization in (self.jwt, self.token):
+            # the user and profile in one query, then from the cache
+            with self.assertNumQueries(2):
+                response = self.vote(authorization)
+            self.assertStatusCode(response, status.HTTP_200_OK)
+
+            with self.assertNumQueries(1):
+                response = self.vote(authorization)
+            data = self.assertStatusCode(response, status.HTTP_200_OK)
+            self.assertEqual(data["profile"]["id"], self.user.profile.pk)
+
+            caching.invalidate_user(self.user.pk)
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=0)
+    def test_vote_queries_uncached(self):
+        for authorization in (self.jwt, self.token):
+            for _ in range(2):
+                with self.assertNumQueries(2):
+                    response = self.vote(authorization)
+                self.assertStatusCode(response, status.HTTP_200_OK)
+
+    def test_password_not_cached(self):
+        self.user.set_password("power123!")
+        self.user.save()
+        self.vote(self.jwt)
+
+        entry = cache.get(caching.user_key(self.user.pk))
+        self.assertNotIn("password", entry["user"])
+        self.assertNotIn(self.user.password, str(entry))
+
+    @patch.object(jwt_settings, "CHECK_REVOKE_TOKEN", True)
+    def test_password_change_with_cached_user(self):
+        jwt = f"Bearer {RefreshToken.for_user(self.user).access_token}"
+        self.vote(jwt)
+
+        # the cached md5 of the password hash, without loading the password
+        with self.assertNumQueries(1):
+            response = self.vote(jwt)
+        self.assertStatusCode(response, status.HTTP_200_OK)
+
+        self.user.set_password("changed")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        response = self.vote(jwt)
+        self.assertStatusCode(response, status.HTTP_401_UNAUTHORIZED)
+
+    def test_creator_permission(self):
+        self.vote(self.jwt)
+
+        # the restaurant, the dates a rename expires and the update
+        with self.assertNumQueries(3):
+            response = self.api_client.patch(
+                f"{URL}/{self.restaurant.pk}",
+                {"name": "Castello"},
+                HTTP_AUTHORIZATION=self.jwt
+            )
+        self.assertStatusCode(response, status.HTTP_200_OK)
+
+        other = RestaurantFactory(name="Brunos")
+        response = self.api_client.patch(
+            f"{URL}/{other.pk}",
+            {"name": "Valaries"},
+            HTTP_AUTHORIZATION=self.jwt
+        )
+        self.assertStatusCode(response, status.HTTP_403_FORBIDDEN)
+
+    def test_cached_profile_reads_fresh_votes(self):
+        self.vote(self.jwt)
+        self.user.profile.refresh_from_db()
+        self.user.profile.decrease_daily_votes(3)
+
+        user = caching.get_user(self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.profile.get_daily_votes(), 6)
+
+    def test_saves_invalidate(self):
+        self.vote(self.jwt)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.profile.timezone = "Pacific/Auckland"
+            self.user.profile.save()
+        self.assertEqual(
+            caching.get_user(self.user.pk).profile.timezone,
+            "Pacific/Auckland"
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        for authorization in (self.jwt, self.token):
+            response = self.vote(authorization)
+            self.assertStatusCode(response, status.HTTP_401_UNAUTHORIZED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Token.objects.all().delete()
+        self.user.is_active = True
+        self.user.save()
+        response = self.vote(self.token)
+        self.assertStatusCode(response, status.HTTP_401_UNAUTHORIZED)
+
+
+@patch.object(
+    RestaurantViewSet, "authentication_classes", [StatelessJWTAuthentication]
+)
+class StatelessJWTAuthenticationTests(BaseTestCase):
+    """
+    Tests for the user built from JWT claims and the revocation list
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = UserFactory(is_staff=True)
+        self.user.set_password("power123!")
+        self.user.save()
+        self.restaurant = RestaurantFactory(name="Maxines")
+
+        response = self.api_client.post("/api/auth/login/", {
+            "email": self.user.email,
+            "password": "power123!"
+        })
+        self.access = self.assertStatusCode(
+            response, status.HTTP_200_OK
+        )["access"]
+
+    def most_voted(self, access: str = None):
+        return self.api_client.get(
+            f"{URL}/most_voted",
+            {"date": "2024-02-01"},
+            HTTP_AUTHORIZATION=f"Bearer {access or self.access}"
+        )
+
+    def test_claims_without_queries(self):
+        self.most_voted()
+
+        with self.assertNumQueries(0):
+            response = self.most_voted()
+        self.assertStatusCode(response, status.HTTP_200_OK)
+
+        # today in the user's timezone comes from the claims too
+        response = self.api_client.get(
+            f"{URL}/most_voted", HTTP_AUTHORIZATION=f"Bearer {self.access}"
+        )
+        self.assertStatusCode(response, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            response = self.api_client.get(
+                f"{URL}/most_voted",
+                HTTP_AUTHORIZATION=f"Bearer {self.access}"
+            )
+        self.assertStatusCode(response, status.HTTP_200_OK)
+
+        # what the claims leave out still loads, e.g. for a vote
+        response = self.api_client.post(
+            f"{URL}/{self.restaurant.pk}/vote",
+            HTTP_AUTHORIZATION=f"Bearer {self.access}"
+        )
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual(data["profile"]["id"], self.user.profile.pk)
+        self.assertEqual(data["profile"]["daily_votes"], 9)
+
+    def test_token_without_claims(self):
+        access = str(RefreshToken.for_user(self.user).access_token)
+
+        with self.assertNumQueries(2):
+            response = self.most_voted(access)
+        self.assertStatusCode(response, status.HTTP_200_OK)
+
+    def test_logout_revokes(self):
+        response = self.api_client.post(
+            "/api/auth/logout/", HTTP_AUTHORIZATION=f"Bearer {self.access}"
+        )
+        self.assertStatusCode(response, status.HTTP_200_OK)
+
+        response = self.most_voted()
+        self.assertStatusCode(response, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivation_revokes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        response = self.most_voted()
+        self.assertStatusCode(response, status.HTTP_401_UNAUTHORIZED)
+
+    def login(self):
+        response = self.api_client.post("/api/auth/login/", {
+            "email": self.user.email,
+            "password": "power123!"
+        })
+        return self.assertStatusCode(response, status.HTTP_200_OK)["refresh"]
+
+    def refresh(self, refresh: str):
+        return self.api_client.post(
+            "/api/auth/token/refresh/", {"refresh": refresh}
+        )
+
+    def test_logout_revokes_refresh(self):
+        refresh = self.login()
+        response = self.api_client.post(
+            "/api/auth/logout/",
+            {"refresh": refresh},
+            HTTP_AUTHORIZATION=f"Bearer {self.access}"
+        )
+        self.assertStatusCode(response, status.HTTP_200_OK)
+
+        response = self.refresh(refresh)
+        self.assertStatusCode(response, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_reissues_claims(self):
+        refresh = self.login()
+        User.objects.filter(pk=self.user.pk).update(is_staff=False)
+
+        response = self.refresh(refresh)
+        access = self.assertStatusCode(response, status.HTTP_200_OK)["access"]
+        self.assertFalse(AccessToken(access)["is_staff"])
+
+    def test_deactivation_revokes_refresh(self):
+        refresh = self.login()
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        # inactive users cannot refresh, revoked or not
+        response = self.refresh(refresh)
+        self.assertStatusCode(response, status.HTTP_401_UNAUTHORIZED)
+
+    def test_demotion_and_password_revoke(self):
+        for field, value in (("is_staff", False), ("password", "changed")):
+            refresh = self.login()
+            with self.captureOnCommitCallbacks(execute=True):
+                setattr(self.user, field, value)
+                self.user.save()
+
+            response = self.refresh(refresh)
+            self.assertStatusCode(response, status.HTTP_401_UNAUTHORIZED)
+            cache.delete(revocation.user_key(self.user.pk))
+            self.user.set_password("power123!")
+            self.user.save()
+
+    def test_login_in_same_second_as_password_change(self):
+        with freeze_time("2024-09-05 12:00:00.100000") as frozen:
+            refresh = self.login()
+            frozen.tick(0.2)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.set_password("power123!")
+                self.user.save()
+
+            # the earlier login in the same second stays revoked
+            response = self.refresh(refresh)
+            self.assertStatusCode(response, status.HTTP_401_UNAUTHORIZED)
+
+            frozen.tick(0.2)
+            response = self.refresh(self.login())
+            self.assertStatusCode(response, status.HTTP_200_OK)
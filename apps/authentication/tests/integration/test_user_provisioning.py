@@ -0,0 +1,147 @@
+import tempfile
+
+from datetime import date
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import CommandError, call_command
+
+from allauth.account.models import EmailAddress
+from freezegun import freeze_time
+from rest_framework import status
+
+from apps.authentication.models import User
+from apps.authentication.tests.factory.user import UserFactory
+from apps.profiles.models import Profile
+from apps.utils.helper import set_config_value
+from apps.utils.tests.cases import BaseTestCase
+
+
+URL = "/api/auth/users/provision/"
+
+
+def rows(count: int, start: int = 0):
+    return [
+        {"email": f"Employee{n}@Company.nl", "first_name": f"Employee {n}"}
+        for n in range(start, start + count)
+    ]
+
+
+@freeze_time("2024-09-05 12:00:00")
+class UserProvisioningTests(BaseTestCase):
+    """
+    Tests for creating users, profiles and email addresses in bulk
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.staff = UserFactory(is_staff=True, email="employee0@company.nl")
+        self.force_login(self.staff)
+
+    def provision(self, users):
+        response = self.api_client.post(URL, {"users": users}, format="json")
+        return self.assertStatusCode(response, status.HTTP_200_OK)
+
+    def test_provision(self):
+        set_config_value("USER_DAILY_VOTES", 7)
+
+        data = self.provision(rows(3) + [
+            {"email": "employee1@company.nl", "username": "other"},
+            {"email": "new@company.nl", "username": self.staff.username},
+        ])
+
+        self.assertEqual(data, {"created": 2, "skipped": 3})
+        user = User.objects.get(email="Employee1@company.nl")
+        self.assertEqual(user.username, "Employee1@company.nl")
+        self.assertEqual(user.first_name, "Employee 1")
+        self.assertFalse(user.has_usable_password())
+        self.assertEqual(user.profile.daily_votes, 7)
+        self.assertEqual(user.profile.votes_date, date(2024, 9, 5))
+        self.assertTrue(EmailAddress.objects.get(user=user).primary)
+
+        set_config_value("USER_DAILY_VOTES", 10)
+
+    def test_queries_constant(self):
+        """
+        one lookup and one INSERT per table however many users
+        """
+        self.provision(rows(1, start=100))
+
+        with self.assertNumQueries(6):
+            data = self.provision(rows(50, start=200))
+
+        self.assertEqual(data["created"], 50)
+        self.assertEqual(Profile.objects.count(), 52)
+        self.assertEqual(EmailAddress.objects.count(), 51)
+
+    def test_long_email(self):
+        email = f"{'e' * 150}@company.nl"
+        response = self.api_client.post(
+            URL, {"users": [{"email": email}]}, format="json"
+        )
+        data = self.assertStatusCode(response, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("username", data["users"][0])
+
+        data = self.provision([{"email": email, "username": "long"}])
+        self.assertEqual(data["created"], 1)
+
+    def test_invalid_username(self):
+        response = self.api_client.post(URL, {"users": [
+            {"email": "john@company.nl", "username": "john doe/<x>"},
+            {"email": "j/doe@company.nl"},
+        ]}, format="json")
+        data = self.assertStatusCode(response, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("username", data["users"][0])
+        self.assertIn("username", data["users"][1])
+        self.assertFalse(User.objects.filter(email="john@company.nl").exists())
+
+    def test_username_taken_after_normalizing(self):
+        """
+        a derived username is looked up as the normalized email it becomes
+        """
+        UserFactory(username="Bob@example.com", email="bob@other.nl")
+
+        data = self.provision([{"email": "Bob@EXAMPLE.com"}])
+
+        self.assertEqual(data, {"created": 0, "skipped": 1})
+
+    def test_concurrent_signup(self):
+        untaken = User.objects.untaken
+
+        def signup_in_between(users):
+            new = untaken(users)
+            if not User.objects.filter(username="taken").exists():
+                UserFactory(username="taken", email="taken@company.nl")
+            return new
+
+        with patch.object(
+            User.objects, "untaken", side_effect=signup_in_between
+        ):
+            data = self.provision(rows(2, start=1) + [
+                {"email": "Taken@company.nl", "username": "other"},
+            ])
+
+        self.assertEqual(data, {"created": 2, "skipped": 1})
+        self.assertFalse(User.objects.filter(username="other").exists())
+
+    def test_staff_only(self):
+        self.force_login(UserFactory())
+        response = self.api_client.post(
+            URL, {"users": rows(1, start=1)}, format="json"
+        )
+        self.assertStatusCode(response, status.HTTP_403_FORBIDDEN)
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as file:
+            file.write("email,first_name\na@company.nl,A\nb@company.nl,B\n")
+            file.flush()
+            out = StringIO()
+            call_command("provision_users", file.name, stdout=out)
+
+        self.assertEqual(out.getvalue(), "Created 2 users, skipped 0\n")
+
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as file:
+            file.write("email\nnot-an-email\n")
+            file.flush()
+            with self.assertRaisesMessage(CommandError, "line 2"):
+                call_command("provision_users", file.name)
@@ -1,7 +1,24 @@
 from django.urls import include, path
 
+from apps.authentication.views import (
+    LogoutView,
+    ProvisionUsersView,
+    TokenRefreshView
+)
+
 
 urlpatterns = [
+    path("api/auth/logout/", LogoutView.as_view(), name="rest_logout"),
+    path(
+        "api/auth/token/refresh/",
+        TokenRefreshView.as_view(),
+        name="token_refresh"
+    ),
+    path(
+        "api/auth/users/provision/",
+        ProvisionUsersView.as_view(),
+        name="provision_users"
+    ),
     path("api/auth/", include("dj_rest_auth.urls")),
     path('api/auth/registration/', include('dj_rest_auth.registration.urls'))
 ]
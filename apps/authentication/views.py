@@ -0,0 +1,73 @@
+from dj_rest_auth.app_settings import api_settings as rest_auth_settings
+from dj_rest_auth.jwt_auth import get_refresh_view
+from dj_rest_auth.views import LogoutView as BaseLogoutView
+from drf_spectacular.contrib.rest_auth import RestAuthDetailSerializer
+from drf_spectacular.utils import extend_schema, extend_schema_view
+from rest_framework.generics import GenericAPIView
+from rest_framework.permissions import IsAdminUser
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken, Token
+
+from apps.authentication import revocation
+from apps.authentication.models import User
+from apps.authentication.serializers import (
+    ProfileTokenRefreshSerializer,
+    UserProvisionReportSerializer,
+    UserProvisionSerializer
+)
+
+
+# drf_spectacular's dj_rest_auth extension only describes its own
+# LogoutView, not subclasses. GET logs out only with ACCOUNT_LOGOUT_ON_GET,
+# which is not set.
+@extend_schema_view(
+    get=extend_schema(exclude=True),
+    post=extend_schema(request=None, responses=RestAuthDetailSerializer),
+)
+class LogoutView(BaseLogoutView):
+    """
+    Also revokes the JWT access token the request was made with and the
+    refresh token it sends.
+    """
+
+    def logout(self, request):
+        if isinstance(request.auth, Token):
+            revocation.revoke_token(request.auth)
+        refresh = request.data.get("refresh") or request.COOKIES.get(
+            rest_auth_settings.JWT_AUTH_REFRESH_COOKIE
+        )
+        if refresh:
+            try:
+                revocation.revoke_token(RefreshToken(refresh))
+            except TokenError:
+                pass
+        return super().logout(request)
+
+
+class TokenRefreshView(get_refresh_view()):
+    """
+    dj_rest_auth's refresh view, refusing inactive users and revoked
+    refresh tokens.
+    """
+
+    serializer_class = ProfileTokenRefreshSerializer
+
+
+@extend_schema(tags=["auth"])
+class ProvisionUsersView(GenericAPIView):
+    """
+    Create users, without passwords, with their profiles and email
+    addresses in bulk. Staff only.
+    """
+
+    permission_classes = [IsAdminUser]
+    serializer_class = UserProvisionSerializer
+
+    @extend_schema(responses=UserProvisionReportSerializer)
+    def post(self, request: Request) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        report = User.objects.provision(serializer.validated_data["users"])
+        return Response(UserProvisionReportSerializer(report).data)
@@ -6,5 +6,17 @@ from apps.profiles.tasks import reset_daily_votes_for_all_profles
 class Command(BaseCommand):
     help = "Run the celery reset user daily votes task as a management command"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Profiles reset per committed batch",
+        )
+
     def handle(self, *args, **options):
-        reset_daily_votes_for_all_profles()
+        report = reset_daily_votes_for_all_profles(options["batch_size"])
+        if options["verbosity"]:
+            self.stdout.write(
+                "Reset {profiles} profiles in {seconds:.1f}s "
+                "({rows_per_second:.0f} rows/s)".format(**report)
+            )
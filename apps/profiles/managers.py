@@ -0,0 +1,195 @@
+from datetime import date as Date
+from typing import Iterator, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+from django.core.cache import cache
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+
+# Seconds the list of profile timezones is cached
+TIMEZONES_TIMEOUT = 60 * 60
+
+
+# The profile's local date: %(date)s when given, else today in its timezone
+LOCAL_DATE_SQL = """
+COALESCE(%(date)s::date, (%(now)s AT TIME ZONE timezone)::date)
+"""
+
+# Daily votes left on {votes_date}: the stored ones when they were last
+# changed that day, otherwise a fresh %(allowance)s
+CURRENT_DAILY_VOTES_SQL = """
+(CASE WHEN votes_date = {votes_date} THEN daily_votes ELSE %(allowance)s END)
+"""
+
+SPEND_DAILY_VOTES_SQL = """
+UPDATE {profile_table}
+SET daily_votes = {current_votes} - %(value)s,
+    votes_date = {votes_date},
+    modified = %(now)s
+WHERE id = %(profile)s AND {current_votes} >= %(value)s
+RETURNING daily_votes
+"""
+
+REFUND_DAILY_VOTES_SQL = """
+UPDATE {profile_table}
+SET daily_votes = {current_votes} + %(value)s,
+    votes_date = {votes_date},
+    modified = %(now)s
+WHERE id = %(profile)s
+RETURNING daily_votes
+"""
+
+# Profiles still on an earlier day, only the given timezones' ones when
+# %(timezones)s is set
+RESET_DAILY_VOTES_SQL = """
+UPDATE {profile_table}
+SET daily_votes = %(allowance)s, votes_date = {votes_date}, modified = %(now)s
+WHERE id IN (
+    SELECT id FROM {profile_table}
+    WHERE id > %(after)s
+        AND daily_votes <> %(allowance)s
+        AND votes_date IS DISTINCT FROM {votes_date}
+        AND (
+            %(timezones)s::text[] IS NULL
+            OR timezone = ANY(%(timezones)s)
+        )
+    ORDER BY id
+    LIMIT %(batch_size)s
+)
+RETURNING id
+"""
+
+
+class ProfileManager(models.Manager):
+    """
+    Changes daily votes with one conditional UPDATE each, so concurrent
+    requests for the same profile can neither overspend nor need a row
+    lock or a read before the write.
+
+    Daily votes are reset lazily: votes_date records the day daily_votes
+    belongs to and the first change on a later day starts from the full
+    allowance instead.
+    """
+
+    def _execute(self, sql: str, params: dict) -> list:
+        sql = sql.format(
+            profile_table=self.model._meta.db_table,
+            current_votes=CURRENT_DAILY_VOTES_SQL.format(
+                votes_date=LOCAL_DATE_SQL
+            ),
+            votes_date=LOCAL_DATE_SQL,
+        )
+        params = {"now": timezone.now(), "date": None, **params}
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def _update_daily_votes(
+        self,
+        sql: str,
+        profile_id: int,
+        value: int,
+        date,
+        allowance: Optional[int]
+    ) -> Optional[int]:
+        rows = self._execute(sql, {
+            "profile": profile_id,
+            "value": value,
+            "date": date,
+            "allowance": allowance,
+        })
+        return rows[0][0] if rows else None
+
+    def spend_daily_votes(
+        self,
+        profile_id: int,
+        value: int = 1,
+        date=None,
+        allowance: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Take value votes from the profile's daily votes on date, today in
+        the profile's timezone by default. allowance is what the day starts
+        from when the stored daily votes are from an earlier day, it may be
+        None when they are known to be current.
+
+        Returns the votes left, or None when fewer than value remain.
+        """
+        return self._update_daily_votes(
+            SPEND_DAILY_VOTES_SQL, profile_id, value, date, allowance
+        )
+
+    def refund_daily_votes(
+        self,
+        profile_id: int,
+        value: int = 1,
+        date=None,
+        allowance: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Give value votes back to the profile's daily votes on date, see
+        spend_daily_votes.
+
+        Returns the votes left, or None when the profile does not exist.
+        """
+        return self._update_daily_votes(
+            REFUND_DAILY_VOTES_SQL, profile_id, value, date, allowance
+        )
+
+    def reset_daily_votes(
+        self,
+        allowance: int,
+        timezones: Optional[List[str]] = None,
+        batch_size: int = 1000,
+        after: int = 0
+    ) -> Iterator[Tuple[int, int]]:
+        """
+        Give every profile with an id above after allowance daily votes for
+        today in its timezone, in primary key ordered batches each
+        committed on its own. Profiles already holding allowance are
+        skipped, so only recent voters are written, and so are profiles
+        whose daily votes are already today's, so nobody votes twice in
+        one local day.
+
+        With timezones only profiles in those zones are reset.
+
+        Yields the last id and the number of profiles reset by each batch.
+        """
+        params = {
+            "allowance": allowance,
+            "timezones": timezones,
+            "batch_size": batch_size,
+            "after": after,
+        }
+        while True:
+            with transaction.atomic():
+                rows = self._execute(RESET_DAILY_VOTES_SQL, params)
+            if not rows:
+                return
+
+            params["after"] = max(row[0] for row in rows)
+            yield params["after"], len(rows)
+
+    def timezones(self) -> List[str]:
+        """
+        Every timezone a profile is in, cached for TIMEZONES_TIMEOUT.
+        """
+        return cache.get_or_set(
+            "profile-timezones",
+            lambda: list(
+                self.order_by("timezone")
+                .values_list("timezone", flat=True)
+                .distinct()
+            ),
+            TIMEZONES_TIMEOUT,
+        )
+
+    def local_dates(self) -> Set[Date]:
+        """
+        Today's date in each timezone a profile is in.
+        """
+        return {
+            timezone.localdate(timezone=ZoneInfo(name))
+            for name in self.timezones()
+        } or {timezone.localdate()}
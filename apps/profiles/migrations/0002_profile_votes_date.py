@@ -0,0 +1,27 @@
+# Generated by Django 5.1 on 2026-10-18 13:43
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def date_daily_votes(apps, schema_editor):
+    # existing daily votes were set by the nightly reset at midnight in
+    # TIME_ZONE, so they are today's there
+    Profile = apps.get_model('profiles', 'Profile')
+    Profile.objects.update(votes_date=timezone.localdate())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='votes_date',
+            field=models.DateField(blank=True, help_text='Day daily_votes belongs to, earlier days start afresh.', null=True),
+        ),
+        migrations.RunPython(date_daily_votes, migrations.RunPython.noop),
+    ]
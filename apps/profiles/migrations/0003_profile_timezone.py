@@ -0,0 +1,19 @@
+# Generated by Django 5.1 on 2026-10-18 13:47
+
+import apps.profiles.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0002_profile_votes_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='timezone',
+            field=models.CharField(default=apps.profiles.models.default_timezone, help_text="Zone the user's votes are dated and reset in.", max_length=64, validators=[apps.profiles.models.validate_timezone]),
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations
+from django.utils import timezone
+
+
+def remove_reset_task(apps, schema_editor):
+    # the DatabaseScheduler never deletes a task dropped from
+    # CELERY_BEAT_SCHEDULE, so the nightly full reset would keep running
+    PeriodicTask = apps.get_model('django_celery_beat', 'PeriodicTask')
+    PeriodicTasks = apps.get_model('django_celery_beat', 'PeriodicTasks')
+
+    removed, _ = PeriodicTask.objects.filter(
+        task='apps.profiles.tasks.reset_daily_votes_for_all_profles'
+    ).delete()
+    if removed:
+        # tells a running beat to reload its schedule
+        PeriodicTasks.objects.update_or_create(
+            ident=1, defaults={'last_update': timezone.now()}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0003_profile_timezone'),
+        ('django_celery_beat', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_reset_task, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,28 @@
+from datetime import date as Date
+from typing import Optional
+from zoneinfo import ZoneInfo, available_timezones
+
 from django.conf import settings
-from django.db import models
-from django.db.models.signals import post_save
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from django.utils import timezone
 
+from apps.authentication import caching
 from apps.authentication.models import User
+from apps.profiles.managers import ProfileManager
 from apps.utils.helper import get_config_value
-from apps.utils.models import CreatedModifiedMixin
+from apps.utils.models import CreatedModifiedMixin, NULLABLE
+
+
+def default_timezone() -> str:
+    return settings.TIME_ZONE
+
+
+def validate_timezone(value: str):
+    if value not in available_timezones():
+        raise ValidationError(f"{value} is not a known timezone.")
 
 
 class Profile(CreatedModifiedMixin):
@@ -14,23 +31,80 @@ class Profile(CreatedModifiedMixin):
         on_delete=models.CASCADE
     )
     daily_votes = models.PositiveIntegerField()
+    votes_date = models.DateField(
+        help_text="Day daily_votes belongs to, earlier days start afresh.",
+        **NULLABLE
+    )
+    timezone = models.CharField(
+        max_length=64,
+        default=default_timezone,
+        validators=[validate_timezone],
+        help_text="Zone the user's votes are dated and reset in."
+    )
+
+    objects = ProfileManager()
 
     def __str__(self) -> str:
         return f"{self.user.email}"
 
-    def decrease_daily_votes(self, value: int = 1):
-        self.daily_votes = (
-            self.daily_votes - value if self.daily_votes > 0 else 0
+    def zone(self) -> ZoneInfo:
+        return ZoneInfo(self.timezone)
+
+    def today(self) -> Date:
+        """
+        Today's date in the profile's timezone, the date votes are cast on.
+        """
+        return timezone.localdate(timezone=self.zone())
+
+    def vote_allowance(self, date) -> Optional[int]:
+        """
+        Daily votes date starts from, None when daily_votes already belongs
+        to date and no reset is needed.
+        """
+        if self.votes_date == date:
+            return None
+        return get_config_value("USER_DAILY_VOTES")
+
+    def get_daily_votes(self, date=None) -> int:
+        """
+        Daily votes left on date, today by default.
+        """
+        if "daily_votes" in self.get_deferred_fields():
+            # e.g. a profile cached for authentication
+            self.refresh_from_db(fields=["daily_votes", "votes_date"])
+        allowance = self.vote_allowance(date or self.today())
+        return self.daily_votes if allowance is None else allowance
+
+    def _update_daily_votes(self, update, value: int) -> Optional[int]:
+        date = self.today()
+        daily_votes = update(
+            self.pk, value, date, allowance=self.vote_allowance(date)
         )
-        self.save()
+        if daily_votes is not None:
+            self.daily_votes = daily_votes
+            self.votes_date = date
+        return daily_votes
+
+    def decrease_daily_votes(self, value: int = 1) -> bool:
+        """
+        Spend value daily votes, returns False when not enough are left.
+        """
+        daily_votes = self._update_daily_votes(
+            Profile.objects.spend_daily_votes, value
+        )
+        return daily_votes is not None
 
     def increase_daily_votes(self, value: int = 1):
-        self.daily_votes = self.daily_votes + value
-        self.save()
+        self._update_daily_votes(Profile.objects.refund_daily_votes, value)
 
     def reset_daily_votes(self):
         self.daily_votes = get_config_value("USER_DAILY_VOTES")
-        self.save()
+        self.votes_date = self.today()
+        Profile.objects.filter(pk=self.pk).update(
+            daily_votes=self.daily_votes,
+            votes_date=self.votes_date,
+            modified=timezone.now()
+        )
 
 
 @receiver(post_save, sender=User)
@@ -39,7 +113,19 @@ def create_profile(sender, instance: User, created: bool, **kwargs):
     Create profile on when a user is created.
     """
     if created:
-        Profile.objects.create(
+        profile = Profile(
             user=instance,
             daily_votes=get_config_value("USER_DAILY_VOTES")
         )
+        profile.votes_date = profile.today()
+        profile.save()
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_user_cache(sender, instance: Profile, **kwargs):
+    """
+    Drop the profile's user cached for authentication once committed.
+    """
+    user_id = instance.user_id
+    transaction.on_commit(lambda: caching.invalidate_user(user_id))
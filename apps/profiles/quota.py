@@ -0,0 +1,217 @@
+import logging
+import time
+
+from datetime import datetime, time as Time, timedelta
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from django_redis import get_redis_connection
+
+from apps.profiles.models import Profile
+from apps.utils.helper import get_config_value
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds an interrupted reset keeps its checkpoint
+CHECKPOINT_TIMEOUT = 60 * 60 * 24
+
+
+def reset_report(reset: int, started: float) -> Dict[str, float]:
+    """
+    Profiles reset since started, a time.monotonic() value, and the rate.
+    """
+    seconds = time.monotonic() - started
+    return {
+        "profiles": reset,
+        "seconds": seconds,
+        "rows_per_second": reset / seconds if seconds else 0.0,
+    }
+
+
+class DatabaseQuota:
+    """
+    Keeps each user's remaining votes in Profile.daily_votes. The vote
+    statements spend and refund them in the same query as the vote, so
+    there is nothing for the caller to do.
+    """
+
+    in_database = True
+
+    def remaining(self, profile: Profile) -> int:
+        return profile.get_daily_votes()
+
+    def spend(self, profile: Profile, value: int = 1) -> Optional[int]:
+        """
+        Take value votes, returns the votes left or None when fewer than
+        value remain.
+        """
+        if not profile.decrease_daily_votes(value):
+            return None
+        return profile.daily_votes
+
+    def refund(self, profile: Profile, value: int = 1) -> Optional[int]:
+        """
+        Give value votes back, returns the votes left.
+        """
+        profile.increase_daily_votes(value)
+        return profile.daily_votes
+
+    def reset_all(
+        self,
+        batch_size: int = 1000,
+        timezones: Optional[List[str]] = None
+    ) -> Dict[str, float]:
+        """
+        Give every user still on an earlier day their full daily votes,
+        today's voters keep what they have left. Not needed at midnight, a
+        new day already starts from the full allowance on first use. With
+        timezones only the users there are reset.
+
+        Each batch records the last profile id as a checkpoint, so a run
+        that was killed resumes after it instead of resetting the profiles
+        that voted again since.
+        """
+        checkpoint = ":".join([
+            "vote-quota-reset",
+            timezone.localdate().isoformat(),
+            *sorted(timezones or []),
+        ])
+        started = time.monotonic()
+        reset = 0
+
+        batches = Profile.objects.reset_daily_votes(
+            get_config_value("USER_DAILY_VOTES"),
+            timezones,
+            batch_size,
+            after=cache.get(checkpoint, 0),
+        )
+        for last_id, rows in batches:
+            reset += rows
+            cache.set(checkpoint, last_id, CHECKPOINT_TIMEOUT)
+            logger.info(
+                "Reset daily votes up to profile %s, %.0f rows/s",
+                last_id,
+                reset_report(reset, started)["rows_per_second"],
+            )
+
+        cache.delete(checkpoint)
+        return reset_report(reset, started)
+
+
+# KEYS[1] quota key, ARGV[1] votes, ARGV[2] daily allowance or "" when it
+# was not read yet, ARGV[3] expiry timestamp.
+# Returns the votes left, -1 when too few are left and -2 when the key
+# does not exist yet and the allowance is needed to create it.
+SPEND_SCRIPT = """
+local value = redis.call('GET', KEYS[1])
+if not value then
+    if ARGV[2] == '' then
+        return -2
+    end
+    value = ARGV[2]
+end
+value = tonumber(value) - tonumber(ARGV[1])
+if value < 0 then
+    return -1
+end
+redis.call('SET', KEYS[1], value)
+redis.call('EXPIREAT', KEYS[1], ARGV[3])
+return value
+"""
+
+# Same arguments as SPEND_SCRIPT, but the allowance is always given. A
+# refund never goes above the allowance, a missing key already holds every
+# vote.
+REFUND_SCRIPT = """
+local value = redis.call('GET', KEYS[1])
+if not value then
+    value = ARGV[2]
+else
+    value = math.min(tonumber(value) + tonumber(ARGV[1]), tonumber(ARGV[2]))
+end
+redis.call('SET', KEYS[1], value)
+redis.call('EXPIREAT', KEYS[1], ARGV[3])
+return value
+"""
+
+
+class RedisQuota(DatabaseQuota):
+    """
+    Keeps each user's remaining votes in a Redis key that expires at the
+    next midnight in the user's timezone and starts lazily from
+    USER_DAILY_VOTES, so votes never write to Profile and nothing has to
+    be reset at midnight.
+    """
+
+    in_database = False
+
+    def __init__(self):
+        self.redis = get_redis_connection("default")
+        self.spend_script = self.redis.register_script(SPEND_SCRIPT)
+        self.refund_script = self.redis.register_script(REFUND_SCRIPT)
+
+    def key(self, profile: Profile) -> str:
+        return f"vote-quota:{profile.today().isoformat()}:{profile.pk}"
+
+    def expires_at(self, profile: Profile) -> int:
+        tomorrow = profile.today() + timedelta(days=1)
+        midnight = datetime.combine(tomorrow, Time.min, tzinfo=profile.zone())
+        return int(midnight.timestamp())
+
+    def _run(
+        self, script, profile: Profile, value: int, allowance=""
+    ) -> int:
+        key = self.key(profile)
+        args = [value, allowance, self.expires_at(profile)]
+        result = script(keys=[key], args=args)
+        if result == -2:
+            # first vote of the day, only now read the allowance
+            args[1] = get_config_value("USER_DAILY_VOTES")
+            result = script(keys=[key], args=args)
+        return result
+
+    def remaining(self, profile: Profile) -> int:
+        value = self.redis.get(self.key(profile))
+        if value is None:
+            return get_config_value("USER_DAILY_VOTES")
+        return int(value)
+
+    def spend(self, profile: Profile, value: int = 1) -> Optional[int]:
+        result = self._run(self.spend_script, profile, value)
+        if result < 0:
+            return None
+
+        profile.daily_votes = result
+        return result
+
+    def refund(self, profile: Profile, value: int = 1) -> Optional[int]:
+        profile.daily_votes = self._run(
+            self.refund_script,
+            profile,
+            value,
+            get_config_value("USER_DAILY_VOTES"),
+        )
+        return profile.daily_votes
+
+    def reset_all(
+        self,
+        batch_size: int = 1000,
+        timezones: Optional[List[str]] = None
+    ) -> Dict[str, float]:
+        """
+        Nothing to reset: the keys of users on an earlier day already
+        expired at their midnight, and the remaining keys are today's.
+        """
+        return reset_report(0, time.monotonic())
+
+
+def get_vote_quota() -> DatabaseQuota:
+    """
+    Daily vote quota backend configured by VOTE_QUOTA_BACKEND.
+    """
+    return import_string(settings.VOTE_QUOTA_BACKEND)()
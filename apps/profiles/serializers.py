@@ -1,11 +1,19 @@
 from rest_framework import serializers
 
 from apps.profiles.models import Profile
+from apps.profiles.quota import get_vote_quota
 
 
 class ProfileSerializer(serializers.ModelSerializer):
     id = serializers.ReadOnlyField()
+    daily_votes = serializers.SerializerMethodField()
 
     class Meta:
         model = Profile
-        fields = ["id", "user", "daily_votes"]
+        fields = ["id", "user", "daily_votes", "timezone"]
+
+    def get_daily_votes(self, profile: Profile) -> int:
+        """
+        Votes left today, from wherever VOTE_QUOTA_BACKEND keeps them.
+        """
+        return get_vote_quota().remaining(profile)
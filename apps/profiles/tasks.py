@@ -1,9 +1,37 @@
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.utils import timezone
+
 from besteats.celery import app
 
 from apps.profiles.models import Profile
-from apps.utils.helper import get_config_value
+from apps.profiles.quota import get_vote_quota
+
+
+@app.task()
+def reset_daily_votes_for_all_profles(batch_size: int = None) -> dict:
+    """
+    Optional cleanup giving every user still on an earlier day their full
+    daily votes, see DatabaseQuota.reset_all. Returns the profiles reset
+    and the rate.
+    """
+    return get_vote_quota().reset_all(
+        batch_size or settings.DAILY_VOTES_RESET_BATCH_SIZE
+    )
 
 
 @app.task()
-def reset_daily_votes_for_all_profles():
-    Profile.objects.update(daily_votes=get_config_value("USER_DAILY_VOTES"))
+def reset_daily_votes_after_midnight() -> dict:
+    """
+    Run hourly, resets the daily votes of the timezones that passed
+    midnight in the last hour, so each zone is cleaned up in its own small
+    wave. Returns the profiles reset and the rate.
+    """
+    timezones = [
+        name for name in Profile.objects.timezones()
+        if timezone.localtime(timezone=ZoneInfo(name)).hour == 0
+    ]
+    return get_vote_quota().reset_all(
+        settings.DAILY_VOTES_RESET_BATCH_SIZE, timezones
+    ) if timezones else {}
@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from apps.authentication.tests.factory.user import UserFactory
+from apps.profiles.models import Profile
+from apps.utils.tests.cases import BaseTestCase
+
+
+class ProfileDailyVotesTests(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.profile = UserFactory().profile
+
+    def test_spend_daily_votes(self):
+        with self.assertNumQueries(1):
+            self.assertTrue(self.profile.decrease_daily_votes(4))
+        self.assertEqual(self.profile.daily_votes, 6)
+
+        # spending more than is left changes nothing
+        self.assertFalse(self.profile.decrease_daily_votes(7))
+        self.assertEqual(self.profile.daily_votes, 6)
+
+        self.assertEqual(Profile.objects.spend_daily_votes(self.profile.pk), 5)
+        self.assertIsNone(Profile.objects.spend_daily_votes(self.profile.pk, 6))
+
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.daily_votes, 5)
+
+    def test_refund_daily_votes(self):
+        self.profile.decrease_daily_votes(10)
+        self.assertEqual(self.profile.daily_votes, 0)
+
+        with self.assertNumQueries(1):
+            self.profile.increase_daily_votes()
+        self.assertEqual(self.profile.daily_votes, 1)
+
+        self.assertIsNone(Profile.objects.refund_daily_votes(0))
+
+    def test_stale_instance(self):
+        """
+        the database decides, not the daily votes the instance last saw
+        """
+        stale = Profile.objects.get(pk=self.profile.pk)
+        self.profile.decrease_daily_votes(10)
+
+        self.assertEqual(stale.daily_votes, 10)
+        self.assertFalse(stale.decrease_daily_votes())
+
+    def test_lazy_reset(self):
+        """
+        the first change on a new day starts from the full daily votes
+        """
+        self.profile.decrease_daily_votes(10)
+        yesterday = timezone.localdate() - timedelta(days=1)
+        Profile.objects.filter(pk=self.profile.pk).update(
+            votes_date=yesterday
+        )
+        self.profile.refresh_from_db()
+
+        self.assertEqual(self.profile.daily_votes, 0)
+        self.assertEqual(self.profile.get_daily_votes(), 10)
+        self.assertEqual(self.profile.get_daily_votes(yesterday), 0)
+
+        self.assertTrue(self.profile.decrease_daily_votes())
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.daily_votes, 9)
+        self.assertEqual(self.profile.votes_date, timezone.localdate())
+
+    def test_reset_skips_full_profiles(self):
+        spent = self.profile
+        spent.decrease_daily_votes(3)
+        Profile.objects.filter(pk=spent.pk).update(
+            votes_date=timezone.localdate() - timedelta(days=1)
+        )
+        full = UserFactory().profile
+
+        batches = Profile.objects.reset_daily_votes(10, batch_size=1)
+
+        self.assertEqual(list(batches), [(spent.pk, 1)])
+        spent.refresh_from_db()
+        self.assertEqual(spent.daily_votes, 10)
+        self.assertEqual(
+            Profile.objects.get(pk=full.pk).modified, full.modified
+        )
+
+    def test_reset_skips_todays_voters(self):
+        """
+        a reset never hands out a second allowance on the same local day
+        """
+        self.profile.decrease_daily_votes(3)
+
+        batches = Profile.objects.reset_daily_votes(10)
+
+        self.assertEqual(list(batches), [])
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.daily_votes, 7)
@@ -1,9 +1,15 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
 from django.core.management import call_command
+from django.utils import timezone
 
 from rest_framework import status
 
 from apps.restaurants.tests.factory.restaurant import RestaurantFactory
 from apps.authentication.tests.factory.user import UserFactory
+from apps.profiles.models import Profile
 from apps.utils.helper import get_config_value
 from apps.utils.tests.cases import BaseTestCase
 
@@ -17,6 +23,14 @@ class ProfileTests(BaseTestCase):
         self.restaurant_1 = RestaurantFactory(name="Maxines")
         self.force_login(self.user)
 
+    def age_daily_votes(self):
+        """
+        Date every profile's daily votes yesterday.
+        """
+        Profile.objects.update(
+            votes_date=timezone.localdate() - timedelta(days=1)
+        )
+
     def test_reset_daily_votes_for_all_profles(self):
 
         # users profile daily_votes are defaulted at 10 for now
@@ -30,6 +44,13 @@ class ProfileTests(BaseTestCase):
         # user's daily_votes should decrease by 1
         self.assertEqual(self.user.profile.daily_votes, 9)
 
+        # today's votes are left alone
+        call_command("reset_daily_votes_for_all_profles", verbosity=0)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.profile.daily_votes, 9)
+
+        self.age_daily_votes()
         call_command("reset_daily_votes_for_all_profles", verbosity=0)
 
         self.user.refresh_from_db()
@@ -38,3 +59,39 @@ class ProfileTests(BaseTestCase):
         self.assertEqual(
             self.user.profile.daily_votes, get_config_value("USER_DAILY_VOTES")
         )
+
+    def test_reset_in_batches(self):
+        users = [self.user, UserFactory(), UserFactory()]
+        for user in users:
+            user.profile.decrease_daily_votes(2)
+        self.age_daily_votes()
+
+        out = StringIO()
+        call_command(
+            "reset_daily_votes_for_all_profles", batch_size=2, stdout=out
+        )
+
+        self.assertIn("Reset 3 profiles", out.getvalue())
+        self.assertIn("rows/s", out.getvalue())
+        for user in users:
+            user.profile.refresh_from_db()
+            self.assertEqual(user.profile.daily_votes, 10)
+
+    def test_reset_resumes_from_checkpoint(self):
+        """
+        a killed run resumes after the last committed batch
+        """
+        done, pending = self.user.profile, UserFactory().profile
+        done.decrease_daily_votes(2)
+        pending.decrease_daily_votes(2)
+        self.age_daily_votes()
+
+        cache.set(
+            f"vote-quota-reset:{timezone.localdate().isoformat()}", done.pk
+        )
+        call_command("reset_daily_votes_for_all_profles", verbosity=0)
+
+        done.refresh_from_db()
+        pending.refresh_from_db()
+        self.assertEqual(done.daily_votes, 8)
+        self.assertEqual(pending.daily_votes, 10)
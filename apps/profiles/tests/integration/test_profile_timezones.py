@@ -0,0 +1,95 @@
+from datetime import date
+
+from freezegun import freeze_time
+from rest_framework import status
+
+from apps.authentication.tests.factory.user import UserFactory
+from apps.profiles.models import Profile
+from apps.profiles.tasks import reset_daily_votes_after_midnight
+from apps.restaurants.models import RestaurantVote
+from apps.restaurants.tests.factory.restaurant import RestaurantFactory
+from apps.utils.tests.cases import BaseTestCase
+
+
+URL = "/api/restaurants"
+
+
+def profile_in(name: str) -> Profile:
+    profile = UserFactory().profile
+    profile.timezone = name
+    profile.save()
+    return profile
+
+
+@freeze_time("2024-09-05 12:15:00")
+class ProfileTimezoneTests(BaseTestCase):
+    """
+    Tests for votes dated and reset in each profile's timezone
+    """
+
+    def setUp(self):
+        super().setUp()
+        # 00:15 on the 6th in Auckland, 05:15 on the 5th in Los Angeles
+        self.auckland = profile_in("Pacific/Auckland")
+        self.los_angeles = profile_in("America/Los_Angeles")
+        self.restaurant = RestaurantFactory(name="Maxines")
+
+    def test_today(self):
+        self.assertEqual(self.auckland.today(), date(2024, 9, 6))
+        self.assertEqual(self.los_angeles.today(), date(2024, 9, 5))
+
+    def test_votes_dated_in_timezone(self):
+        for profile in (self.auckland, self.los_angeles):
+            self.force_login(profile.user)
+            response = self.api_client.post(
+                f"{URL}/{self.restaurant.pk}/vote"
+            )
+            self.assertStatusCode(response, status.HTTP_200_OK)
+
+        self.assertEqual(
+            RestaurantVote.objects.get(profile=self.auckland).date,
+            date(2024, 9, 6)
+        )
+        self.assertEqual(
+            RestaurantVote.objects.get(profile=self.los_angeles).date,
+            date(2024, 9, 5)
+        )
+
+        # each user's leaderboard defaults to their own today
+        response = self.api_client.get(f"{URL}/most_voted")
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual(data[0]["total_voter_count"], 1)
+
+    def test_spend_without_date_uses_timezone(self):
+        Profile.objects.filter(pk=self.auckland.pk).update(
+            daily_votes=0, votes_date=date(2024, 9, 5)
+        )
+
+        self.assertEqual(
+            Profile.objects.spend_daily_votes(self.auckland.pk, allowance=10),
+            9
+        )
+        self.auckland.refresh_from_db()
+        self.assertEqual(self.auckland.votes_date, date(2024, 9, 6))
+
+    def test_reset_after_midnight(self):
+        """
+        only zones that just passed midnight are reset, and only the users
+        there still on the previous day
+        """
+        voted_today = profile_in("Pacific/Auckland")
+        voted_today.decrease_daily_votes(5)
+        Profile.objects.filter(
+            pk__in=[self.auckland.pk, self.los_angeles.pk]
+        ).update(daily_votes=3, votes_date=date(2024, 9, 5))
+
+        report = reset_daily_votes_after_midnight()
+
+        self.assertEqual(report["profiles"], 1)
+        self.auckland.refresh_from_db()
+        self.assertEqual(self.auckland.daily_votes, 10)
+        self.assertEqual(self.auckland.votes_date, date(2024, 9, 6))
+        self.assertEqual(
+            Profile.objects.get(pk=self.los_angeles.pk).daily_votes, 3
+        )
+        self.assertEqual(Profile.objects.get(pk=voted_today.pk).daily_votes, 5)
@@ -0,0 +1,114 @@
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import override_settings
+
+from rest_framework import status
+
+from apps.authentication.tests.factory.user import UserFactory
+from apps.profiles.quota import RedisQuota
+from apps.restaurants.models import RestaurantVote
+from apps.restaurants.tests.factory.restaurant import RestaurantFactory
+from apps.utils.tests.cases import BaseTestCase
+
+
+URL = "/api/restaurants"
+
+
+@override_settings(VOTE_QUOTA_BACKEND="apps.profiles.quota.RedisQuota")
+class RedisQuotaTests(BaseTestCase):
+    """
+    Tests for daily votes kept in Redis instead of Profile.daily_votes
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = UserFactory()
+        self.restaurant = RestaurantFactory(name="Maxines")
+        self.quota = RedisQuota()
+        self.force_login(self.user)
+
+    def remaining(self):
+        return self.quota.remaining(self.user.profile)
+
+    def today(self):
+        return self.user.profile.today()
+
+    def test_vote_spends_from_redis(self):
+        response = self.api_client.post(f"{URL}/{self.restaurant.pk}/vote")
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+
+        self.assertEqual(data["profile"]["daily_votes"], 9)
+        self.assertEqual(self.remaining(), 9)
+
+        # the profile row is left alone
+        self.user.profile.refresh_from_db()
+        self.assertEqual(self.user.profile.daily_votes, 10)
+
+        response = self.api_client.post(f"{URL}/{self.restaurant.pk}/unvote")
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+
+        self.assertEqual(data["profile"]["daily_votes"], 10)
+        self.assertEqual(self.remaining(), 10)
+
+    def test_history_reports_redis_balance(self):
+        self.api_client.post(f"{URL}/{self.restaurant.pk}/vote")
+
+        response = self.api_client.get(f"{URL}/votes/history")
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual(data["results"][0]["profile"]["daily_votes"], 9)
+
+    def test_no_votes_left(self):
+        response = self.api_client.post(
+            f"{URL}/votes",
+            {"votes": [{"restaurant": self.restaurant.pk, "count": 10}]},
+            format="json"
+        )
+        self.assertStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual(self.remaining(), 0)
+
+        response = self.api_client.post(f"{URL}/{self.restaurant.pk}/vote")
+        self.assertStatusCode(response, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(RestaurantVote.objects.get().count, 10)
+
+    def test_missing_restaurant_refunds(self):
+        response = self.api_client.post(f"{URL}/0/vote")
+        self.assertStatusCode(response, status.HTTP_404_NOT_FOUND)
+
+        self.assertEqual(self.remaining(), 10)
+        self.assertFalse(RestaurantVote.objects.exists())
+
+    def test_failed_vote_refunds(self):
+        with patch.object(
+            RestaurantVote.objects, "_raw", side_effect=DatabaseError
+        ):
+            with self.assertRaises(DatabaseError):
+                RestaurantVote.objects.cast(
+                    self.user.profile, self.restaurant.pk, self.today()
+                )
+        self.assertEqual(self.remaining(), 10)
+
+    def test_failed_refund_keeps_vote(self):
+        self.api_client.post(f"{URL}/{self.restaurant.pk}/vote")
+
+        with patch.object(RedisQuota, "refund", side_effect=ConnectionError):
+            with self.assertRaises(ConnectionError):
+                RestaurantVote.objects.retract(
+                    self.user.profile, self.restaurant.pk, self.today()
+                )
+        self.assertEqual(RestaurantVote.objects.get().count, 1)
+        self.assertEqual(self.remaining(), 9)
+
+    def test_refund_capped_at_allowance(self):
+        self.quota.spend(self.user.profile, 1)
+        self.quota.refund(self.user.profile, 5)
+        self.assertEqual(self.remaining(), 10)
+
+    def test_reset_keeps_todays_votes(self):
+        self.api_client.post(f"{URL}/{self.restaurant.pk}/vote")
+        self.assertEqual(self.remaining(), 9)
+
+        call_command("reset_daily_votes_for_all_profles", verbosity=0)
+
+        self.assertEqual(self.remaining(), 9)
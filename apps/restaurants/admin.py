@@ -1,14 +1,29 @@
 from django.contrib import admin
 
-from apps.restaurants.models import Restaurant, RestaurantVote
+from apps.restaurants.models import (
+    Restaurant,
+    RestaurantVote,
+    RestaurantVoteTally
+)
 
 
 @admin.register(Restaurant)
 class RestaurantAdmin(admin.ModelAdmin):
     list_display = ["name", "profile"]
+    list_select_related = ["profile__user"]
 
 
 @admin.register(RestaurantVote)
 class RestaurantVoteAdmin(admin.ModelAdmin):
     list_display = ["profile", "restaurant", "date", "count", "total"]
+    list_select_related = ["profile__user", "restaurant"]
     readonly_fields = ["id", "profile", "restaurant", "date", "count", "total"]
+
+
+@admin.register(RestaurantVoteTally)
+class RestaurantVoteTallyAdmin(admin.ModelAdmin):
+    list_display = ["restaurant", "date", "total_votes", "voter_count"]
+    list_select_related = ["restaurant"]
+    readonly_fields = [
+        "id", "restaurant", "date", "total_votes", "voter_count"
+    ]
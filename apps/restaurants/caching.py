@@ -0,0 +1,206 @@
+"""
+Caches in front of the restaurant list and detail views and most_voted.
+
+Cached responses hold the serialized data with its ETag and Last-Modified,
+so a repeat or conditional GET is answered from Redis without touching the
+database. Every list entry is keyed by a version bumped on each restaurant
+write and each detail entry by a version bumped when its restaurant
+changes. Versions are read before rendering, so a render racing a write
+caches the old data under a key no later request reads.
+
+most_voted results are keyed by a per-date version bumped by each vote, and
+only one request recomputes a missing result while the others wait for it.
+"""
+import hashlib
+import time
+
+from datetime import date as Date, datetime, time as Time, timedelta
+from typing import Any, Callable, List, Optional, Tuple
+from urllib.parse import urlencode
+from zoneinfo import ZoneInfo
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.http import QueryDict
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+
+VERSION_KEY = "restaurants:version"
+LAST_MODIFIED_KEY = "restaurants:last-modified"
+
+# The last timezone to finish a day, UTC-12
+LAST_ZONE = ZoneInfo("Etc/GMT+12")
+
+# Seconds a recomputation may hold its lock, and how often and how long the
+# other requests check for its result before computing it themselves
+SINGLE_FLIGHT_LOCK_TIMEOUT = 10
+SINGLE_FLIGHT_WAIT = 0.05
+SINGLE_FLIGHT_ATTEMPTS = 40
+
+
+# The query params the list view reads, any other one shares their entry
+# instead of caching a new one per request
+LIST_PARAMS = (
+    "search",
+    "ordering",
+    "limit",
+    "offset",
+    "cursor",
+    "pagination",
+    "count",
+    "format",
+)
+
+
+def list_key(version: int, request: Request) -> str:
+    """
+    Keyed by host too, as pages link to the next and previous ones with
+    absolute URLs.
+    """
+    params: QueryDict = request.query_params
+    query = urlencode(sorted(
+        (key, value) for key in LIST_PARAMS for value in params.getlist(key)
+    ))
+    url = f"{request.scheme}://{request.get_host()}?{query}"
+    digest = hashlib.md5(url.encode()).hexdigest()
+    return f"restaurants:list:{version}:{digest}"
+
+
+def detail_version_key(pk) -> str:
+    return f"restaurants:detail-version:{pk}"
+
+
+def detail_key(pk) -> str:
+    version = cache.get(detail_version_key(pk), 0)
+    return f"restaurants:detail:{pk}:{version}"
+
+
+def bump(key: str):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def invalidate(pk=None):
+    """
+    Drop the cached lists and the restaurant's detail, if given.
+    """
+    bump(VERSION_KEY)
+    cache.set(LAST_MODIFIED_KEY, timezone.now(), None)
+    if pk is not None:
+        bump(detail_version_key(pk))
+
+
+def list_state() -> Tuple[int, datetime]:
+    """
+    Current list version and when any restaurant last changed.
+    """
+    state = cache.get_many([VERSION_KEY, LAST_MODIFIED_KEY])
+    last_modified = state.get(LAST_MODIFIED_KEY)
+    if last_modified is None:
+        restaurants = apps.get_model("restaurants.Restaurant").objects
+        last_modified = (
+            restaurants.aggregate(modified=Max("modified"))["modified"]
+            or timezone.now()
+        )
+        cache.set(LAST_MODIFIED_KEY, last_modified, None)
+    return state.get(VERSION_KEY, 0), last_modified
+
+
+def cached_response(
+    request: Request,
+    key: str,
+    render: Callable[[], Tuple[Response, Optional[datetime]]]
+) -> Response:
+    """
+    Serve the entry cached under key, rendering and caching it first when
+    missing. render returns the response and when its data last changed.
+    Answers 304 Not Modified when the request's ETag or date still match.
+    """
+    entry = cache.get(key)
+    if entry is None:
+        response, last_modified = render()
+        if response.status_code != 200:
+            return response
+
+        entry = {
+            "data": response.data,
+            "etag": quote_etag(hashlib.md5(
+                f"{key}:{last_modified.timestamp()}".encode()
+            ).hexdigest()),
+            "last_modified": int(last_modified.timestamp()),
+        }
+        cache.set(key, entry, settings.RESTAURANT_CACHE_TIMEOUT)
+
+    response = get_conditional_response(
+        request,
+        etag=entry["etag"],
+        last_modified=entry["last_modified"],
+    ) or Response(entry["data"])
+    response.headers["ETag"] = entry["etag"]
+    response.headers["Last-Modified"] = http_date(entry["last_modified"])
+    return response
+
+
+def single_flight(key: str, compute: Callable[[], Any], timeout) -> Any:
+    """
+    Value cached under key, computed by only one caller at a time when
+    missing. The others wait for that result, and compute it themselves
+    only if it does not arrive in time.
+    """
+    value = cache.get(key)
+    lock = f"{key}:lock"
+    for _ in range(SINGLE_FLIGHT_ATTEMPTS):
+        if value is not None:
+            return value
+        if cache.add(lock, 1, SINGLE_FLIGHT_LOCK_TIMEOUT):
+            try:
+                value = compute()
+                cache.set(key, value, timeout)
+                return value
+            finally:
+                cache.delete(lock)
+
+        time.sleep(SINGLE_FLIGHT_WAIT)
+        value = cache.get(key)
+    return value if value is not None else compute()
+
+
+def most_voted_version_key(date: Date) -> str:
+    return f"most-voted:version:{date.isoformat()}"
+
+
+def bump_most_voted(*dates: Date):
+    """
+    Expire the cached most voted restaurants for each date.
+    """
+    for date in dates:
+        bump(most_voted_version_key(date))
+
+
+def most_voted(date: Date, compute: Callable[[Date], List]) -> List:
+    """
+    Cached most voted restaurants for date. Days that are over in every
+    timezone are kept until a vote is written for them or one of their
+    restaurants is renamed or deleted, others only for
+    MOST_VOTED_CACHE_TIMEOUT.
+    """
+    timeout = settings.MOST_VOTED_CACHE_TIMEOUT
+    day_after = datetime.combine(date + timedelta(days=1), Time.min, LAST_ZONE)
+    if day_after <= timezone.now():
+        timeout = None
+
+    version = cache.get(most_voted_version_key(date), 0)
+    return single_flight(
+        f"most-voted:{date.isoformat()}:{version}",
+        lambda: compute(date),
+        timeout,
+    )
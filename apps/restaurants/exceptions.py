@@ -13,3 +13,10 @@ class RestaurantUnvoteException(APIException):
     default_detail = (
         "User has not cast a vote yet"
     )
+
+
+class RestaurantImportException(APIException):
+    status_code = 400
+    default_detail = (
+        "The import file could not be read"
+    )
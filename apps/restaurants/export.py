@@ -0,0 +1,102 @@
+"""
+Streamed RestaurantVote exports.
+
+Votes are read through a server-side cursor in chunks and written out one
+line at a time, so an export of any size holds only one chunk in memory
+and its first bytes go out before the query has finished.
+"""
+import csv
+
+from datetime import date as Date
+from typing import Iterator, Tuple
+
+from django.conf import settings
+from django.db import transaction
+
+from apps.restaurants.models import RestaurantVote
+from apps.utils.renderers import ORJSONRenderer
+
+
+CSV = "csv"
+NDJSON = "ndjson"
+
+CONTENT_TYPES = {
+    CSV: "text/csv",
+    NDJSON: "application/x-ndjson",
+}
+
+COLUMNS = (
+    "id",
+    "date",
+    "restaurant_id",
+    "restaurant__name",
+    "profile_id",
+    "count",
+    "total",
+    "created",
+)
+HEADER = [column.replace("__", "_") for column in COLUMNS]
+
+# Text starting with these is run as a formula by spreadsheets
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+class Echo:
+    """
+    File-like object handing back what csv.writer writes to it.
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def rows(start: Date, end: Date, chunk_size: int = None) -> Iterator[Tuple]:
+    """
+    Votes dated from start to end, in primary key order.
+    """
+    # in autocommit the cursor is declared WITH HOLD, which makes Postgres
+    # build the whole result at the implicit commit before the first fetch
+    with transaction.atomic():
+        yield from RestaurantVote.objects.filter(
+            date__range=(start, end)
+        ).order_by("id").values_list(*COLUMNS).iterator(
+            chunk_size=chunk_size or settings.VOTE_EXPORT_CHUNK_SIZE
+        )
+
+
+def csv_cell(value):
+    """
+    Text cells quoted with a leading ' when a spreadsheet would otherwise
+    evaluate them, e.g. a restaurant named =HYPERLINK(...).
+    """
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def csv_lines(votes: Iterator[Tuple]) -> Iterator[str]:
+    writer = csv.writer(Echo())
+    yield writer.writerow(HEADER)
+    for vote in votes:
+        yield writer.writerow([csv_cell(value) for value in vote])
+
+
+def ndjson_lines(votes: Iterator[Tuple]) -> Iterator[str]:
+    renderer = ORJSONRenderer()
+    for vote in votes:
+        yield renderer.render(dict(zip(HEADER, vote))).decode() + "\n"
+
+
+WRITERS = {
+    CSV: csv_lines,
+    NDJSON: ndjson_lines,
+}
+
+
+def lines(
+    start: Date, end: Date, file_format: str = CSV, chunk_size: int = None
+) -> Iterator[str]:
+    """
+    The export of votes from start to end as lines of file_format.
+    """
+    return WRITERS[file_format](rows(start, end, chunk_size))
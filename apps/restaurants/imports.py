@@ -0,0 +1,74 @@
+"""
+Bulk restaurant imports.
+
+The names in a CSV or JSONL file are copied into a temporary staging table
+with COPY and merged into the restaurant table by one INSERT ... SELECT,
+where ON CONFLICT skips every name that exists in any case.
+"""
+import csv
+import json
+
+from typing import IO, Iterator
+
+from apps.restaurants.exceptions import RestaurantImportException
+
+
+CSV = "csv"
+JSONL = "jsonl"
+
+
+def csv_names(file: IO[str]) -> Iterator[str]:
+    """
+    The name column of a CSV file with a header row.
+    """
+    reader = csv.DictReader(file)
+    if "name" not in (reader.fieldnames or []):
+        raise RestaurantImportException("The CSV file has no name column")
+    for row in reader:
+        yield row["name"] or ""
+
+
+def jsonl_names(file: IO[str]) -> Iterator[str]:
+    """
+    The name of each object in a file with one JSON object per line.
+    """
+    for number, line in enumerate(file, 1):
+        if not line.strip():
+            continue
+        try:
+            name = json.loads(line)["name"]
+        except (ValueError, TypeError, KeyError):
+            name = None
+        # null, numbers and objects are not names
+        if not isinstance(name, str):
+            raise RestaurantImportException(
+                f"Line {number} is not a JSON object with a text name"
+            )
+        yield name
+
+
+READERS = {
+    CSV: csv_names,
+    JSONL: jsonl_names,
+}
+
+
+def read(file: IO[str], file_format: str) -> Iterator[str]:
+    """
+    The names READERS finds in file, failing with a RestaurantImportException
+    on text that is not UTF-8 or malformed CSV, decoded and parsed only as
+    the names are read.
+    """
+    try:
+        yield from READERS[file_format](file)
+    except UnicodeDecodeError:
+        raise RestaurantImportException("The file is not UTF-8 encoded")
+    except csv.Error as exc:
+        raise RestaurantImportException(f"The CSV file is malformed: {exc}")
+
+
+def names(file: IO[str], file_format: str = CSV) -> Iterator[str]:
+    """
+    The restaurant names in file, stripped of surrounding whitespace.
+    """
+    return (name.strip() for name in read(file, file_format))
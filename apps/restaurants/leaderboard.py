@@ -0,0 +1,270 @@
+import logging
+
+from datetime import date as Date
+from typing import Dict, List
+
+from django.conf import settings
+from django.db.models import F, OrderBy, Subquery, Sum, Window
+from django.db.models.functions import Rank
+from django.utils.module_loading import import_string
+
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError, WatchError
+
+from apps.restaurants.models import (
+    Restaurant,
+    RestaurantVote,
+    RestaurantVoteTally
+)
+from apps.restaurants.serializers import RankOrderSerializer
+
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseLeaderboard:
+    """
+    Reads the daily winners from RestaurantVoteTally, which the vote and
+    unvote statements already keep up to date.
+    """
+
+    def record(self, votes: List[RestaurantVote]):
+        """
+        Apply cast or retracted votes, all of one date, to the leaderboard.
+        """
+
+    def reconcile(self, date: Date):
+        """
+        Bring the leaderboard for date back in line with RestaurantVote.
+        """
+
+    def most_voted(self, date: Date) -> List[Dict]:
+        """
+        Restaurant(s) holding both the most voters and the most votes.
+        """
+        tallies = RestaurantVoteTally.objects.filter(
+            date=date, voter_count__gt=0
+        )
+
+        return list(
+            tallies.filter(
+                voter_count=Subquery(
+                    tallies.order_by("-voter_count")
+                    .values("voter_count")[:1]
+                ),
+                total_votes=Subquery(
+                    tallies.order_by("-total_votes")
+                    .values("total_votes")[:1]
+                )
+            )
+            .order_by("restaurant_id")
+            .values(
+                "restaurant_id",
+                "total_votes",
+                restaurant_name=F("restaurant__name"),
+                total_voter_count=F("voter_count"),
+            )
+        )
+
+    def order_by(
+        self,
+        order: str,
+        votes: str = "total_votes",
+        voters: str = "voter_count"
+    ) -> List[OrderBy]:
+        fields = [votes, voters]
+        if order == RankOrderSerializer.ORDER_BY_VOTERS:
+            fields.reverse()
+        return [F(field).desc() for field in fields]
+
+    def ranking(
+        self,
+        date: Date,
+        limit: int,
+        order: str = RankOrderSerializer.ORDER_BY_VOTES
+    ) -> List[Dict]:
+        """
+        Top ``limit`` restaurants for date with their rank, ties sharing a
+        rank. ``order`` picks whether total votes or voters rank first.
+        """
+        return list(
+            RestaurantVoteTally.objects
+            .filter(date=date, voter_count__gt=0)
+            .annotate(rank=Window(Rank(), order_by=self.order_by(order)))
+            .order_by("rank", "restaurant_id")
+            .values(
+                "rank",
+                "restaurant_id",
+                "total_votes",
+                restaurant_name=F("restaurant__name"),
+                total_voter_count=F("voter_count"),
+            )[:limit]
+        )
+
+    def history(
+        self,
+        start: Date,
+        end: Date,
+        order: str = RankOrderSerializer.ORDER_BY_VOTES
+    ) -> Dict[str, List[Dict]]:
+        """
+        Winner(s) of each day between start and end, inclusive, and every
+        restaurant's totals over the range.
+        """
+        tallies = RestaurantVoteTally.objects.filter(
+            date__range=(start, end), voter_count__gt=0
+        )
+
+        winners = (
+            tallies.annotate(
+                rank=Window(
+                    Rank(),
+                    partition_by=F("date"),
+                    order_by=self.order_by(order)
+                )
+            )
+            .filter(rank=1)
+            .order_by("date", "restaurant_id")
+            .values(
+                "date",
+                "restaurant_id",
+                "total_votes",
+                restaurant_name=F("restaurant__name"),
+                total_voter_count=F("voter_count"),
+            )
+        )
+
+        totals = (
+            tallies.values("restaurant_id")
+            .annotate(
+                restaurant_name=F("restaurant__name"),
+                votes=Sum("total_votes"),
+                voters=Sum("voter_count"),
+            )
+            .order_by(*self.order_by(order, "votes", "voters"), "restaurant_id")
+        )
+
+        return {"winners": list(winners), "totals": list(totals)}
+
+
+class RedisLeaderboard(DatabaseLeaderboard):
+    """
+    Keeps a sorted set of total votes and one of voter counts per date in
+    Redis, so the winners are read with O(log n) range lookups.
+
+    Postgres stays the source of truth: the sets are only a live copy,
+    reconciled periodically by the reconcile_leaderboard task, and reads
+    fall back to the database when the sets are missing or Redis is down.
+
+    Votes are added once committed. A rebuild WATCHes the sets from before
+    it reads the database until it replaces them, and starts over when a
+    vote changes them in between, so no vote is lost. A vote committed
+    before the read but added only after the replacement still counts
+    twice, until the next reconcile.
+    """
+
+    # Rebuilds a reconcile starts before leaving the sets to the next one
+    RECONCILE_ATTEMPTS = 3
+
+    def __init__(self):
+        self.redis = get_redis_connection("default")
+        self.timeout = settings.LEADERBOARD_REDIS_TIMEOUT
+
+    def keys(self, date: Date):
+        prefix = f"leaderboard:{date.isoformat()}"
+        return f"{prefix}:total", f"{prefix}:voters"
+
+    def record(self, votes: List[RestaurantVote]):
+        date = votes[0].date
+        total_key, voters_key = self.keys(date)
+        try:
+            if not self.redis.exists(total_key):
+                # never increment a set missing earlier votes, e.g. after
+                # a flush, rebuild it from the database instead. The
+                # database already holds every vote of the batch.
+                self.reconcile(date)
+                return
+
+            pipeline = self.redis.pipeline()
+            for vote in votes:
+                pipeline.zincrby(
+                    total_key, float(vote.delta), vote.restaurant_id
+                )
+                pipeline.zincrby(
+                    voters_key, vote.voter_delta, vote.restaurant_id
+                )
+            pipeline.expire(total_key, self.timeout)
+            pipeline.expire(voters_key, self.timeout)
+            pipeline.execute()
+        except RedisError:
+            logger.warning("Unable to record vote on the leaderboard")
+
+    def reconcile(self, date: Date):
+        total_key, voters_key = self.keys(date)
+        for attempt in range(1, self.RECONCILE_ATTEMPTS + 1):
+            with self.redis.pipeline() as pipeline:
+                pipeline.watch(total_key, voters_key)
+                tallies = list(RestaurantVoteTally.objects.aggregates(date))
+
+                pipeline.multi()
+                pipeline.delete(total_key, voters_key)
+                # an empty marker keeps an empty day from being rebuilt on
+                # each vote
+                pipeline.zadd(total_key, {"": 0})
+                for tally in tallies:
+                    restaurant = tally["restaurant"]
+                    pipeline.zadd(
+                        total_key, {restaurant: float(tally["total_votes"])}
+                    )
+                    pipeline.zadd(
+                        voters_key, {restaurant: tally["voter_count"]}
+                    )
+                pipeline.expire(total_key, self.timeout)
+                pipeline.expire(voters_key, self.timeout)
+                try:
+                    pipeline.execute()
+                    return
+                except WatchError:
+                    # a vote was added since the read, read it again
+                    if attempt == self.RECONCILE_ATTEMPTS:
+                        raise
+
+    def _leaders(self, key: str) -> Dict[int, float]:
+        top = self.redis.zrevrange(key, 0, 0, withscores=True)
+        if not top or top[0][1] <= 0:
+            return {}
+
+        score = top[0][1]
+        members = self.redis.zrangebyscore(key, score, score)
+        return {int(member): score for member in members if member}
+
+    def most_voted(self, date: Date) -> List[Dict]:
+        total_key, voters_key = self.keys(date)
+        try:
+            if not self.redis.exists(total_key):
+                return super().most_voted(date)
+
+            totals = self._leaders(total_key)
+            voters = self._leaders(voters_key)
+        except RedisError:
+            logger.warning("Unable to read the leaderboard from Redis")
+            return super().most_voted(date)
+
+        return [
+            {
+                "restaurant_id": restaurant["id"],
+                "restaurant_name": restaurant["name"],
+                "total_votes": totals[restaurant["id"]],
+                "total_voter_count": int(voters[restaurant["id"]]),
+            }
+            for restaurant in Restaurant.objects.filter(
+                id__in=totals.keys() & voters.keys()
+            ).order_by("id").values("id", "name")
+        ]
+
+
+def get_leaderboard() -> DatabaseLeaderboard:
+    """
+    Leaderboard backend configured by LEADERBOARD_BACKEND.
+    """
+    return import_string(settings.LEADERBOARD_BACKEND)()
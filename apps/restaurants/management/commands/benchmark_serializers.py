@@ -0,0 +1,82 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from rest_framework.renderers import JSONRenderer
+
+from apps.restaurants.models import Restaurant
+from apps.restaurants.serializers import (
+    RestaurantMostVotedSerializer,
+    RestaurantSerializer
+)
+from apps.utils.renderers import ORJSONRenderer
+from apps.utils.serializers import flat_representation
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the CPU time of serializing and rendering a restaurant "
+        "list page and a most_voted response with DRF serializers and "
+        "JSONRenderer against the values() fast path and ORJSONRenderer"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100)
+        parser.add_argument("--requests", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rows = [
+            {"id": pk, "name": f"Restaurant {pk}"}
+            for pk in range(1, options["rows"] + 1)
+        ]
+        restaurants = [Restaurant(**row) for row in rows]
+        most_voted = [
+            {
+                "restaurant_id": row["id"],
+                "restaurant_name": row["name"],
+                "total_votes": 1.5,
+                "total_voter_count": 2,
+            }
+            for row in rows
+        ]
+
+        cases = {
+            "restaurant list": (
+                lambda: JSONRenderer().render(
+                    RestaurantSerializer(
+                        restaurants, many=True, context={"request": None}
+                    ).data
+                ),
+                lambda: ORJSONRenderer().render(
+                    flat_representation(RestaurantSerializer, rows)
+                ),
+            ),
+            "most_voted": (
+                lambda: JSONRenderer().render(
+                    RestaurantMostVotedSerializer(most_voted, many=True).data
+                ),
+                lambda: ORJSONRenderer().render(
+                    flat_representation(
+                        RestaurantMostVotedSerializer, most_voted
+                    )
+                ),
+            ),
+        }
+        for name, (before, after) in cases.items():
+            self.stdout.write(
+                "{}: {:.3f}ms -> {:.3f}ms per request".format(
+                    name,
+                    self.measure(before, options["requests"]),
+                    self.measure(after, options["requests"]),
+                )
+            )
+
+    def measure(self, render, requests: int) -> float:
+        """
+        Milliseconds of CPU per call of render.
+        """
+        render()
+        started = time.process_time()
+        for _ in range(requests):
+            render()
+        return (time.process_time() - started) * 1000 / requests
@@ -0,0 +1,43 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from apps.restaurants import export
+
+
+class Command(BaseCommand):
+    help = "Stream the votes dated from start to end as CSV or NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("start", type=date.fromisoformat)
+        parser.add_argument("end", type=date.fromisoformat)
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=list(export.WRITERS),
+            default=export.CSV,
+        )
+        parser.add_argument(
+            "--output",
+            help="File to write, standard output when omitted",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            help="Votes fetched per round trip of the database cursor",
+        )
+
+    def handle(self, *args, **options):
+        lines = export.lines(
+            options["start"],
+            options["end"],
+            options["file_format"],
+            options["chunk_size"],
+        )
+        if options["output"] is None:
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+
+        with open(options["output"], "w", newline="") as output:
+            output.writelines(lines)
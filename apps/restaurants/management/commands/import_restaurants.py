@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.restaurants import imports
+from apps.restaurants.exceptions import RestaurantImportException
+from apps.restaurants.models import Restaurant
+
+
+class Command(BaseCommand):
+    help = (
+        "Create restaurants from a CSV or JSONL file of names, skipping "
+        "names that already exist in any case"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("file")
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=list(imports.READERS),
+            help="Defaults to the file extension",
+        )
+
+    def handle(self, *args, **options):
+        file_format = options["file_format"] or (
+            imports.JSONL if options["file"].endswith(".jsonl")
+            else imports.CSV
+        )
+        try:
+            with open(options["file"], encoding="utf-8", newline="") as file:
+                report = Restaurant.objects.import_names(
+                    imports.names(file, file_format)
+                )
+        except RestaurantImportException as exc:
+            raise CommandError(exc.detail)
+
+        if options["verbosity"]:
+            self.stdout.write(
+                "Inserted {inserted} restaurants, skipped {skipped}".format(
+                    **report
+                )
+            )
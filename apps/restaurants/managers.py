@@ -0,0 +1,413 @@
+import csv
+
+from tempfile import SpooledTemporaryFile
+from typing import Dict, Iterable, List
+
+from django.apps import apps
+from django.db import connection, models, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Collate, Lower
+from django.utils import timezone
+
+from apps.profiles.managers import CURRENT_DAILY_VOTES_SQL
+from apps.profiles.quota import get_vote_quota
+from apps.restaurants import caching
+from apps.restaurants.scoring import score_sql
+
+
+IMPORT_STAGING_SQL = """
+CREATE TEMPORARY TABLE restaurant_import (name text) ON COMMIT DROP
+"""
+
+IMPORT_COPY_SQL = """
+COPY restaurant_import (name) FROM STDIN WITH (FORMAT csv)
+"""
+
+# Inserts the staged names that fit, skipping any already taken in any case
+IMPORT_MERGE_SQL = """
+WITH inserted AS (
+    INSERT INTO {restaurant_table} (name, profile_id, created, modified)
+    SELECT name, %(profile)s, %(now)s, %(now)s
+    FROM restaurant_import
+    WHERE name <> '' AND char_length(name) <= %(max_length)s
+    ON CONFLICT ((lower(name))) DO NOTHING
+    RETURNING id
+)
+SELECT
+    (SELECT count(*) FROM inserted),
+    (SELECT count(*) FROM restaurant_import)
+"""
+
+# Names held in memory before the staged COPY data spills to disk
+IMPORT_SPOOL_SIZE = 16 * 1024 * 1024
+
+# Spends the votes from Profile.daily_votes
+SPEND_QUOTA_SQL = """
+    UPDATE {profile_table}
+    SET daily_votes = {current_votes} - %(spent)s,
+        votes_date = %(date)s,
+        modified = %(now)s
+    WHERE id = %(profile)s
+        AND {current_votes} >= %(spent)s
+        AND (SELECT found FROM restaurants)
+    RETURNING id, daily_votes
+"""
+
+# Reports the votes left by a quota kept outside the database
+EXTERNAL_QUOTA_SQL = """
+    SELECT id, %(daily_votes)s::integer AS daily_votes
+    FROM {profile_table}
+    WHERE id = %(profile)s
+        AND (SELECT found FROM restaurants)
+"""
+
+REFUND_QUOTA_SQL = """
+    UPDATE {profile_table}
+    SET daily_votes = {current_votes} + 1,
+        votes_date = %(date)s,
+        modified = %(now)s
+    WHERE id IN (SELECT profile_id FROM change)
+    RETURNING daily_votes
+"""
+
+EXTERNAL_REFUND_SQL = """
+    SELECT %(daily_votes)s::integer AS daily_votes
+"""
+
+# Spend and refund statements keyed by whether the quota is in the database
+QUOTA_SQL = {
+    True: (SPEND_QUOTA_SQL, REFUND_QUOTA_SQL),
+    False: (EXTERNAL_QUOTA_SQL, EXTERNAL_REFUND_SQL),
+}
+
+CAST_VOTES_SQL = """
+WITH entries AS (
+    SELECT *
+    FROM unnest(%(restaurants)s::bigint[], %(counts)s::integer[])
+        AS entries (restaurant_id, votes)
+), restaurants AS (
+    SELECT count(*) = cardinality(%(restaurants)s::bigint[]) AS found
+    FROM {restaurant_table}
+    WHERE id = ANY(%(restaurants)s)
+), quota AS (
+    {quota}
+), vote AS (
+    INSERT INTO {vote_table} AS existing (
+        created, modified, profile_id, restaurant_id, date, count
+    )
+    SELECT
+        %(now)s, %(now)s, quota.id, entries.restaurant_id, %(date)s,
+        entries.votes
+    FROM entries, quota
+    ON CONFLICT ON CONSTRAINT unique_restaurant_vote DO UPDATE SET
+        count = existing.count + EXCLUDED.count,
+        modified = EXCLUDED.modified
+    RETURNING *
+), change AS (
+    SELECT
+        vote.*,
+        vote.total - {previous_score} AS delta,
+        CASE WHEN vote.count = entries.votes THEN 1 ELSE 0 END AS voter_delta
+    FROM vote JOIN entries USING (restaurant_id)
+), tally AS (
+    INSERT INTO {tally_table} AS existing (
+        created, modified, restaurant_id, date, total_votes, voter_count
+    )
+    SELECT
+        %(now)s, %(now)s, change.restaurant_id, change.date,
+        change.delta, change.voter_delta
+    FROM change
+    ON CONFLICT ON CONSTRAINT unique_restaurant_vote_tally DO UPDATE SET
+        total_votes = existing.total_votes + EXCLUDED.total_votes,
+        voter_count = existing.voter_count + EXCLUDED.voter_count,
+        modified = EXCLUDED.modified
+)
+SELECT change.*, quota.daily_votes, restaurant.name AS restaurant_name
+FROM change
+    JOIN {restaurant_table} AS restaurant
+        ON restaurant.id = change.restaurant_id,
+    quota
+ORDER BY change.restaurant_id
+"""
+
+RETRACT_VOTE_SQL = """
+WITH change AS (
+    UPDATE {vote_table}
+    SET count = count - 1, modified = %(now)s
+    WHERE date = %(date)s
+        AND profile_id = %(profile)s
+        AND restaurant_id = %(restaurant)s
+        AND count > 0
+    RETURNING *,
+        total - {retracted_score} AS delta,
+        CASE WHEN count = 0 THEN -1 ELSE 0 END AS voter_delta
+), quota AS (
+    {refund}
+), tally AS (
+    UPDATE {tally_table} AS tally
+    SET total_votes = tally.total_votes + change.delta,
+        voter_count = tally.voter_count + change.voter_delta,
+        modified = %(now)s
+    FROM change
+    WHERE tally.date = change.date
+        AND tally.restaurant_id = change.restaurant_id
+)
+SELECT change.*, quota.daily_votes, restaurant.name AS restaurant_name
+FROM change
+    JOIN {restaurant_table} AS restaurant
+        ON restaurant.id = change.restaurant_id,
+    quota
+"""
+
+
+def db_table(model_name: str) -> str:
+    return apps.get_model(model_name)._meta.db_table
+
+
+def search_name() -> Collate:
+    """
+    Lowercased name in the "C" collation, indexed so both prefix matches
+    and ordering by it are index range scans.
+    """
+    return Collate(Lower("name"), "C")
+
+
+class RestaurantManager(models.Manager):
+
+    def search(self, query: str) -> models.QuerySet:
+        """
+        Restaurants whose name starts with query, ignoring case, in name
+        order so an exact match ranks first.
+        """
+        return (
+            self.annotate(search_name=search_name())
+            .filter(search_name__startswith=query.lower())
+            .order_by("search_name")
+        )
+
+    def import_names(self, names: Iterable[str], profile=None) -> Dict:
+        """
+        Create a restaurant for each name not yet taken in any case, in one
+        COPY and one INSERT. Empty, too long and taken names are skipped.
+        """
+        with SpooledTemporaryFile(IMPORT_SPOOL_SIZE, "w+", newline="") as data:
+            csv.writer(data).writerows([name] for name in names)
+            data.seek(0)
+
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(IMPORT_STAGING_SQL)
+                cursor.copy_expert(IMPORT_COPY_SQL, data)
+                cursor.execute(
+                    IMPORT_MERGE_SQL.format(
+                        restaurant_table=self.model._meta.db_table
+                    ),
+                    {
+                        "profile": profile.pk if profile else None,
+                        "now": timezone.now(),
+                        "max_length": self.model._meta.get_field(
+                            "name"
+                        ).max_length,
+                    }
+                )
+                inserted, staged = cursor.fetchone()
+                transaction.on_commit(caching.invalidate)
+
+        return {"inserted": inserted, "skipped": staged - inserted}
+
+
+class RestaurantVoteManager(models.Manager):
+    """
+    Casts and retracts votes in a single statement each.
+
+    The vote row, the profile's daily votes and the restaurant's daily tally
+    are changed by one CTE so a click costs one round trip and concurrent
+    clicks resolve through ON CONFLICT instead of racing on
+    unique_restaurant_vote.
+    """
+
+    def _raw(self, sql: str, profile, date, in_database=True, **params):
+        tables = {
+            "profile_table": db_table("profiles.Profile"),
+            "restaurant_table": db_table("restaurants.Restaurant"),
+            "vote_table": db_table("restaurants.RestaurantVote"),
+            "tally_table": db_table("restaurants.RestaurantVoteTally"),
+        }
+        current_votes = CURRENT_DAILY_VOTES_SQL.format(votes_date="%(date)s")
+        quota, refund = QUOTA_SQL[in_database]
+        sql = sql.format(
+            quota=quota.format(current_votes=current_votes, **tables),
+            refund=refund.format(current_votes=current_votes, **tables),
+            previous_score=score_sql("(vote.count - entries.votes)"),
+            retracted_score=score_sql("(count + 1)"),
+            **tables
+        )
+        params.update({
+            "now": timezone.now(),
+            "profile": profile.pk,
+            "date": date,
+            "allowance": profile.vote_allowance(date) if in_database else None,
+        })
+        restaurant = self.model._meta.get_field("restaurant").related_model
+        votes = list(self.raw(sql, params))
+        for vote in votes:
+            # keep the in-memory profile in step with the row
+            profile.daily_votes = vote.daily_votes
+            profile.votes_date = date
+            vote.profile = profile
+            # the statement returns the name, so serializing needs no query
+            vote.restaurant = restaurant.from_db(
+                self.db,
+                ["id", "name"],
+                [vote.restaurant_id, vote.restaurant_name]
+            )
+        return votes
+
+    def cast(self, profile, restaurant_id: int, date):
+        """
+        Add a vote and spend one of the profile's daily votes.
+
+        The returned vote carries ``delta`` and ``voter_delta``, the change
+        made to the restaurant's total votes and voter count.
+
+        Returns None when the profile has no votes left or the restaurant
+        does not exist.
+        """
+        restaurant_id = int(restaurant_id)
+        if restaurant_id > models.BigIntegerField.MAX_BIGINT:
+            # no such restaurant, and the statement would reject the id
+            return None
+
+        votes = self.cast_many(profile, {restaurant_id: 1}, date)
+        return votes[0] if votes else None
+
+    def retract(self, profile, restaurant_id: int, date):
+        """
+        Remove a vote and give the profile its daily vote back.
+
+        Returns None when the profile has no vote to remove.
+        """
+        if int(restaurant_id) > models.BigIntegerField.MAX_BIGINT:
+            return None
+
+        quota = get_vote_quota()
+        # a refund that fails rolls the removed vote back
+        with transaction.atomic(using=self.db):
+            votes = self._raw(
+                RETRACT_VOTE_SQL,
+                profile,
+                date,
+                in_database=quota.in_database,
+                restaurant=restaurant_id,
+                daily_votes=None,
+            )
+            if not votes:
+                return None
+
+            if not quota.in_database:
+                votes[0].daily_votes = quota.refund(profile)
+        return votes[0]
+
+    def cast_many(self, profile, counts: Dict[int, int], date) -> List:
+        """
+        Add ``count`` votes for each restaurant in counts and spend them from
+        the profile's daily votes, all or nothing.
+
+        Returns an empty list when the profile does not have enough votes
+        left or a restaurant does not exist.
+        """
+        quota = get_vote_quota()
+        spent = sum(counts.values())
+        if quota.in_database:
+            return self._cast(profile, counts, date, spent, in_database=True)
+
+        daily_votes = quota.spend(profile, spent)
+        if daily_votes is None:
+            return []
+
+        votes = []
+        try:
+            votes = self._cast(
+                profile, counts, date, spent, daily_votes=daily_votes
+            )
+        finally:
+            # nothing cast or the statement failed
+            if not votes:
+                quota.refund(profile, spent)
+        return votes
+
+    def _cast(
+        self,
+        profile,
+        counts: Dict[int, int],
+        date,
+        spent: int,
+        in_database: bool = False,
+        daily_votes: int = None
+    ) -> List:
+        return self._raw(
+            CAST_VOTES_SQL,
+            profile,
+            date,
+            in_database=in_database,
+            restaurants=list(counts.keys()),
+            counts=list(counts.values()),
+            spent=spent,
+            daily_votes=daily_votes,
+        )
+
+
+class RestaurantVoteTallyManager(models.Manager):
+    """
+    Rebuilds tallies from RestaurantVote for writes that bypass
+    RestaurantVoteManager.
+    """
+
+    def aggregates(self, date):
+        """
+        Per restaurant totals for date, grouped from the raw votes.
+        """
+        return (
+            apps.get_model("restaurants.RestaurantVote").objects
+            .filter(date=date)
+            .values("restaurant")
+            .annotate(
+                total_votes=Sum("total"),
+                voter_count=Count("profile", filter=Q(count__gt=0)),
+            )
+            .order_by()
+        )
+
+    def refresh(self, date, restaurant_id: int):
+        """
+        Recalculate one restaurant's tally for date from its votes.
+        """
+        aggregates = self.aggregates(date).filter(restaurant=restaurant_id)
+        aggregate = next(iter(aggregates), None)
+        if aggregate is None:
+            self.filter(date=date, restaurant=restaurant_id).delete()
+            return
+
+        self.update_or_create(
+            date=date,
+            restaurant_id=restaurant_id,
+            defaults={
+                "total_votes": aggregate["total_votes"],
+                "voter_count": aggregate["voter_count"],
+            },
+        )
+
+    @transaction.atomic
+    def rebuild(self, date):
+        """
+        Recalculate every restaurant's tally for date from its votes.
+        """
+        self.filter(date=date).delete()
+        self.bulk_create(
+            self.model(
+                date=date,
+                restaurant_id=aggregate["restaurant"],
+                total_votes=aggregate["total_votes"],
+                voter_count=aggregate["voter_count"],
+            )
+            for aggregate in self.aggregates(date)
+        )
@@ -0,0 +1,60 @@
+# Generated by Django 5.1 on 2026-10-18 13:28
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_tallies(apps, schema_editor):
+    RestaurantVote = apps.get_model('restaurants', 'RestaurantVote')
+    RestaurantVoteTally = apps.get_model('restaurants', 'RestaurantVoteTally')
+
+    aggregates = (
+        RestaurantVote.objects
+        .values('date', 'restaurant')
+        .annotate(
+            total_votes=Sum('total'),
+            voter_count=Count('profile', filter=Q(count__gt=0)),
+        )
+        .order_by()
+    )
+    RestaurantVoteTally.objects.bulk_create(
+        (
+            RestaurantVoteTally(
+                date=aggregate['date'],
+                restaurant_id=aggregate['restaurant'],
+                total_votes=aggregate['total_votes'],
+                voter_count=aggregate['voter_count'],
+            )
+            for aggregate in aggregates.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RestaurantVoteTally',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('modified', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('date', models.DateField()),
+                ('total_votes', models.FloatField(default=0, help_text='sum of all user votes for the restaurant on date')),
+                ('voter_count', models.PositiveIntegerField(default=0, help_text='number of users with at least one vote on date')),
+                ('restaurant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vote_tallies', to='restaurants.restaurant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date', '-voter_count'], name='tally_date_voter_count_idx'), models.Index(fields=['date', '-total_votes'], name='tally_date_total_votes_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'restaurant'), name='unique_restaurant_vote_tally')],
+            },
+        ),
+        migrations.RunPython(backfill_tallies, migrations.RunPython.noop),
+    ]
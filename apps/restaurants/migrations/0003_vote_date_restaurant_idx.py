@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-18 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0001_initial'),
+        ('restaurants', '0002_restaurantvotetally'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='restaurantvote',
+            index=models.Index(fields=['date', 'restaurant'], name='vote_date_restaurant_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1 on 2026-10-18 13:37
+
+import django.db.models.expressions
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0003_vote_date_restaurant_idx'),
+    ]
+
+    operations = [
+        # a regular column cannot be altered into a generated one
+        migrations.RemoveField(
+            model_name='restaurantvote',
+            name='total',
+        ),
+        migrations.AddField(
+            model_name='restaurantvote',
+            name='total',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(count__lte=0, then=models.Value(Decimal('0'))), models.When(count=1, then=models.Value(Decimal('1'))), default=models.ExpressionWrapper(django.db.models.expressions.CombinedExpression(models.Value(Decimal('1.5')), '+', django.db.models.expressions.CombinedExpression(models.Value(Decimal('0.25')), '*', django.db.models.expressions.CombinedExpression(models.F('count'), '-', models.Value(2)))), output_field=models.DecimalField(decimal_places=2, max_digits=10)), output_field=models.DecimalField(decimal_places=2, max_digits=10)), help_text='total sum of votes made by user for the restaurant on date', output_field=models.DecimalField(decimal_places=2, max_digits=10)),
+        ),
+        migrations.AlterField(
+            model_name='restaurantvotetally',
+            name='total_votes',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='sum of all user votes for the restaurant on date', max_digits=14),
+        ),
+        # totals are now derived from count, bring the tallies in line
+        migrations.RunSQL(
+            """
+            UPDATE restaurants_restaurantvotetally AS tally
+            SET total_votes = votes.total
+            FROM (
+                SELECT date, restaurant_id, SUM(total) AS total
+                FROM restaurants_restaurantvote
+                GROUP BY date, restaurant_id
+            ) AS votes
+            WHERE tally.date = votes.date
+                AND tally.restaurant_id = votes.restaurant_id
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-18 13:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0003_profile_timezone'),
+        ('restaurants', '0004_score_votes_from_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='restaurantvote',
+            index=models.Index(fields=['profile', '-id'], name='vote_profile_id_idx'),
+        ),
+    ]
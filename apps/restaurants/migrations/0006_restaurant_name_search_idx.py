@@ -0,0 +1,20 @@
+# Generated by Django 5.1 on 2026-10-18 13:53
+
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0003_profile_timezone'),
+        ('restaurants', '0005_vote_profile_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=models.Index(django.db.models.functions.comparison.Collate(django.db.models.functions.text.Lower('name'), 'C'), name='restaurant_name_search_idx'),
+        ),
+    ]
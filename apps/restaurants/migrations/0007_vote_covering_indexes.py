@@ -0,0 +1,32 @@
+# Generated by Django 5.1 on 2026-10-18 14:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0003_profile_timezone'),
+        ('restaurants', '0006_restaurant_name_search_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='restaurantvote',
+            index=models.Index(fields=['date', 'restaurant'], include=('total', 'profile', 'count'), name='vote_date_restaurant_cover_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurantvote',
+            index=models.Index(fields=['restaurant', 'date'], name='vote_restaurant_date_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='restaurantvote',
+            name='vote_date_restaurant_idx',
+        ),
+        migrations.AlterField(
+            model_name='restaurantvote',
+            name='restaurant',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='votes', to='restaurants.restaurant'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1 on 2026-10-18 15:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0004_remove_reset_user_daily_votes_task'),
+        ('restaurants', '0007_vote_covering_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='restaurantvote',
+            name='profile',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='votes', to='profiles.profile'),
+        ),
+    ]
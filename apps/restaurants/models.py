@@ -1,7 +1,21 @@
-from django.db import models
+from django.db import models, transaction
 from django.db.models.functions import Lower
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save
+)
+from django.dispatch import receiver
 
 from apps.profiles.models import Profile
+from apps.restaurants import caching, scoring
+from apps.restaurants.managers import (
+    RestaurantManager,
+    RestaurantVoteManager,
+    RestaurantVoteTallyManager,
+    search_name
+)
 from apps.utils.models import CreatedModifiedMixin, NULLABLE
 
 
@@ -14,6 +28,8 @@ class Restaurant(CreatedModifiedMixin):
         **NULLABLE
     )
 
+    objects = RestaurantManager()
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -21,34 +37,47 @@ class Restaurant(CreatedModifiedMixin):
                 name='unique_name_case_insensitive',
             )
         ]
+        indexes = [
+            # prefix search, see RestaurantManager.search
+            models.Index(search_name(), name="restaurant_name_search_idx"),
+        ]
 
 
 class RestaurantVote(CreatedModifiedMixin):
 
-    FIRST_VOTE = 1
-    SECOND_VOTE = 0.5
-    DEFAULT_VOTE = 0.25
+    FIRST_VOTE = scoring.FIRST_VOTE
+    SECOND_VOTE = scoring.SECOND_VOTE
+    DEFAULT_VOTE = scoring.DEFAULT_VOTE
 
     profile = models.ForeignKey(
         Profile,
         on_delete=models.SET_NULL,
         related_name="votes",
+        # vote_profile_id_idx leads with the profile
+        db_index=False,
         **NULLABLE
     )
     restaurant = models.ForeignKey(
         Restaurant,
         on_delete=models.CASCADE,
-        related_name="votes"
+        related_name="votes",
+        # vote_restaurant_date_idx leads with the restaurant
+        db_index=False
     )
     date = models.DateField()
     count = models.PositiveIntegerField(
         default=1,
         help_text="number of times the user voted for the restaurant on date"
     )
-    total = models.FloatField(
+    total = models.GeneratedField(
+        expression=scoring.score_expression(),
+        output_field=scoring.score_field(),
+        db_persist=True,
         help_text="total sum of votes made by user for the restaurant on date"
     )
 
+    objects = RestaurantVoteManager()
+
     def __str__(self) -> str:
         return f"{self.restaurant.name}"
 
@@ -59,3 +88,152 @@ class RestaurantVote(CreatedModifiedMixin):
                 name="unique_restaurant_vote"
             )
         ]
+        indexes = [
+            # a day's votes grouped per restaurant, see
+            # RestaurantVoteTallyManager.aggregates, read from the index only
+            models.Index(
+                fields=["date", "restaurant"],
+                include=["total", "profile", "count"],
+                name="vote_date_restaurant_cover_idx"
+            ),
+            # a restaurant's votes by date
+            models.Index(
+                fields=["restaurant", "date"],
+                name="vote_restaurant_date_idx"
+            ),
+            # keyset pagination of a user's vote history
+            models.Index(
+                fields=["profile", "-id"],
+                name="vote_profile_id_idx"
+            ),
+        ]
+
+
+class RestaurantVoteTally(CreatedModifiedMixin):
+    """
+    Per date, per restaurant aggregate of RestaurantVote, kept up to date
+    by every vote and unvote so most_voted does not group raw votes.
+    """
+
+    restaurant = models.ForeignKey(
+        Restaurant,
+        on_delete=models.CASCADE,
+        related_name="vote_tallies"
+    )
+    date = models.DateField()
+    total_votes = models.DecimalField(
+        max_digits=14,
+        decimal_places=scoring.SCORE_DECIMAL_PLACES,
+        default=0,
+        help_text="sum of all user votes for the restaurant on date"
+    )
+    voter_count = models.PositiveIntegerField(
+        default=0,
+        help_text="number of users with at least one vote on date"
+    )
+
+    objects = RestaurantVoteTallyManager()
+
+    def __str__(self) -> str:
+        return f"{self.restaurant.name}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "restaurant"],
+                name="unique_restaurant_vote_tally"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["date", "-voter_count"],
+                name="tally_date_voter_count_idx"
+            ),
+            models.Index(
+                fields=["date", "-total_votes"],
+                name="tally_date_total_votes_idx"
+            ),
+        ]
+
+
+@receiver(post_save, sender=RestaurantVote)
+@receiver(post_delete, sender=RestaurantVote)
+def refresh_restaurant_vote_tally(
+    sender, instance: RestaurantVote, origin=None, **kwargs
+):
+    """
+    Re-aggregate the tally when votes are written through the ORM, e.g. the
+    admin. Votes cast through RestaurantVote.objects maintain it themselves,
+    and votes deleted with their restaurant take the tally with them.
+    """
+    if origin is not None and (
+        getattr(origin, "model", type(origin)) is not RestaurantVote
+    ):
+        return
+
+    RestaurantVoteTally.objects.refresh(instance.date, instance.restaurant_id)
+    transaction.on_commit(lambda: caching.bump_most_voted(instance.date))
+
+
+@receiver(pre_delete, sender=Restaurant)
+def expire_deleted_most_voted(sender, instance: Restaurant, **kwargs):
+    """
+    Expire the cached most voted restaurants of every date the restaurant
+    has a tally for, once, instead of once per cascaded vote.
+    """
+    dates = list(RestaurantVoteTally.objects.filter(
+        restaurant_id=instance.pk, voter_count__gt=0
+    ).values_list("date", flat=True))
+    transaction.on_commit(lambda: caching.bump_most_voted(*dates))
+
+
+@receiver(pre_delete, sender=Profile)
+def collect_deleted_voter_dates(sender, instance: Profile, **kwargs):
+    """
+    Remember the dates the profile voted on, whose voter counts drop once
+    its votes lose their profile.
+    """
+    instance.vote_dates = list(
+        RestaurantVote.objects.filter(profile=instance)
+        .values_list("date", flat=True).distinct()
+    )
+
+
+@receiver(post_delete, sender=Profile)
+def rebuild_deleted_voter_tallies(sender, instance: Profile, **kwargs):
+    """
+    Rebuild the tallies of each date the deleted profile voted on once.
+    """
+    dates = getattr(instance, "vote_dates", [])
+    for date in dates:
+        RestaurantVoteTally.objects.rebuild(date)
+    transaction.on_commit(lambda: caching.bump_most_voted(*dates))
+
+
+@receiver(post_save, sender=Restaurant)
+@receiver(post_delete, sender=Restaurant)
+def invalidate_restaurant_cache(sender, instance: Restaurant, **kwargs):
+    """
+    Expire the cached restaurant responses once the write is committed.
+    """
+    pk = instance.pk
+    transaction.on_commit(lambda: caching.invalidate(pk))
+
+
+@receiver(pre_save, sender=Restaurant)
+def expire_renamed_most_voted(sender, instance: Restaurant, **kwargs):
+    """
+    Expire the cached most voted restaurants naming a restaurant being
+    renamed, as past dates are otherwise kept until voted on.
+    """
+    update_fields = kwargs.get("update_fields")
+    if instance._state.adding or (
+        update_fields is not None and "name" not in update_fields
+    ):
+        return
+
+    # none unless the saved name differs
+    dates = list(RestaurantVoteTally.objects.filter(
+        restaurant_id=instance.pk, voter_count__gt=0
+    ).exclude(restaurant__name=instance.name).values_list("date", flat=True))
+    transaction.on_commit(lambda: caching.bump_most_voted(*dates))
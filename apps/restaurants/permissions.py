@@ -14,4 +14,7 @@ class IsRestaurantCreatorOrAdmin(permissions.BasePermission):
             return True
 
         # Grant creators or staff permission to make changes
-        return request.user.is_staff or obj.profile.user == request.user
+        return (
+            request.user.is_staff
+            or obj.profile_id == request.user.profile.pk
+        )
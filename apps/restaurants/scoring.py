@@ -0,0 +1,69 @@
+"""
+Points a user's votes for one restaurant on one day are worth.
+
+The first vote counts FIRST_VOTE, the second SECOND_VOTE and every vote
+after that DEFAULT_VOTE, so the points only depend on the number of votes.
+The same rule is available in Python, as a Django expression and as raw
+SQL so every path scores votes identically and with exact decimals.
+"""
+from decimal import Decimal
+
+from django.db.models import (
+    Case, DecimalField, ExpressionWrapper, F, Value, When
+)
+
+
+FIRST_VOTE = Decimal("1")
+SECOND_VOTE = Decimal("0.5")
+DEFAULT_VOTE = Decimal("0.25")
+
+# Enough for a user voting for one restaurant a few million times a day
+SCORE_MAX_DIGITS = 10
+SCORE_DECIMAL_PLACES = 2
+
+
+def score_field(**kwargs) -> DecimalField:
+    return DecimalField(
+        max_digits=SCORE_MAX_DIGITS,
+        decimal_places=SCORE_DECIMAL_PLACES,
+        **kwargs
+    )
+
+
+def score(count: int) -> Decimal:
+    """
+    Points for count votes.
+    """
+    if count <= 0:
+        return Decimal(0)
+    if count == 1:
+        return FIRST_VOTE
+    return FIRST_VOTE + SECOND_VOTE + DEFAULT_VOTE * (count - 2)
+
+
+def score_expression(count: str = "count") -> Case:
+    """
+    Points for the votes in the count field, as a Django expression.
+    """
+    return Case(
+        When(**{f"{count}__lte": 0}, then=Value(Decimal(0))),
+        When(**{count: 1}, then=Value(FIRST_VOTE)),
+        default=ExpressionWrapper(
+            Value(FIRST_VOTE + SECOND_VOTE)
+            + Value(DEFAULT_VOTE) * (F(count) - Value(2)),
+            output_field=score_field()
+        ),
+        output_field=score_field()
+    )
+
+
+def score_sql(count: str) -> str:
+    """
+    Points for the votes in the count SQL expression, as raw SQL.
+    """
+    return (
+        f"(CASE WHEN {count} <= 0 THEN 0"
+        f" WHEN {count} = 1 THEN {FIRST_VOTE}"
+        f" ELSE {FIRST_VOTE + SECOND_VOTE}"
+        f" + {DEFAULT_VOTE} * ({count} - 2) END)"
+    )
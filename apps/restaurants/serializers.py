@@ -1,9 +1,22 @@
+from typing import Dict, Optional
+
+from django.db import models
 from rest_framework import serializers
 
+from apps.profiles.quota import get_vote_quota
 from apps.profiles.serializers import ProfileSerializer
+from apps.restaurants import export, imports
 from apps.restaurants.models import Restaurant, RestaurantVote
 
 
+# Largest value of an integer column, vote counts are cast to integer[]
+MAX_INTEGER = 2 ** 31 - 1
+
+# Formatters for RestaurantVoteSerializer.to_representation
+DATETIME_FIELD = serializers.DateTimeField()
+DATE_FIELD = serializers.DateField()
+
+
 class RestaurantSerializer(serializers.HyperlinkedModelSerializer):
     id = serializers.ReadOnlyField()
 
@@ -18,8 +31,18 @@ class RestaurantSerializer(serializers.HyperlinkedModelSerializer):
 
 
 class RestaurantVoteSerializer(serializers.ModelSerializer):
-    profile = ProfileSerializer()
-    restaurant = RestaurantSerializer()
+    """
+    Read-only vote with its profile and restaurant.
+
+    The representation is built straight from the instance instead of
+    through the nested serializers, so expect votes to come with their
+    profile and restaurant already loaded, e.g. with select_related, and
+    each page costs the same queries whatever its size. The declared
+    fields describe the output for the schema.
+    """
+    profile = ProfileSerializer(read_only=True)
+    restaurant = RestaurantSerializer(read_only=True)
+    total = serializers.FloatField(read_only=True)
 
     class Meta:
         model = RestaurantVote
@@ -27,6 +50,72 @@ class RestaurantVoteSerializer(serializers.ModelSerializer):
 
     read_only_fields = "__all__"
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.daily_votes = {}
+
+    def profile_representation(self, profile) -> Optional[Dict]:
+        if profile is None:
+            return None
+
+        # a page usually holds a single profile's votes
+        if profile.pk not in self.daily_votes:
+            self.daily_votes[profile.pk] = (
+                get_vote_quota().remaining(profile)
+            )
+
+        return {
+            "id": profile.pk,
+            "user": profile.user_id,
+            "daily_votes": self.daily_votes[profile.pk],
+            "timezone": profile.timezone,
+        }
+
+    def to_representation(self, vote: RestaurantVote) -> Dict:
+        return {
+            "id": vote.pk,
+            "created": DATETIME_FIELD.to_representation(vote.created),
+            "modified": DATETIME_FIELD.to_representation(vote.modified),
+            "profile": self.profile_representation(vote.profile),
+            "restaurant": {
+                "id": vote.restaurant.pk,
+                "name": vote.restaurant.name,
+            },
+            "date": DATE_FIELD.to_representation(vote.date),
+            "count": vote.count,
+            "total": float(vote.total),
+        }
+
+
+class VoteEntrySerializer(serializers.Serializer):
+    restaurant = serializers.IntegerField(
+        min_value=1, max_value=models.BigIntegerField.MAX_BIGINT
+    )
+    count = serializers.IntegerField(
+        min_value=1, max_value=MAX_INTEGER, default=1
+    )
+
+
+class BulkVoteSerializer(serializers.Serializer):
+    votes = VoteEntrySerializer(many=True, allow_empty=False)
+
+    def validate_votes(self, votes):
+        restaurants = [vote["restaurant"] for vote in votes]
+        if len(set(restaurants)) != len(restaurants):
+            raise serializers.ValidationError(
+                "Each restaurant can only be listed once"
+            )
+        return votes
+
+    def get_counts(self):
+        """
+        Votes to cast keyed by restaurant id.
+        """
+        return {
+            vote["restaurant"]: vote["count"]
+            for vote in self.validated_data["votes"]
+        }
+
 
 class RestaurantMostVotedSerializer(serializers.Serializer):
     restaurant_id = serializers.IntegerField(read_only=True)
@@ -35,5 +124,111 @@ class RestaurantMostVotedSerializer(serializers.Serializer):
     total_voter_count = serializers.IntegerField(read_only=True)
 
 
+class RestaurantRankSerializer(RestaurantMostVotedSerializer):
+    rank = serializers.IntegerField(read_only=True)
+
+
+class RestaurantWinnerSerializer(RestaurantMostVotedSerializer):
+    date = serializers.DateField(read_only=True)
+
+
+class RestaurantTotalSerializer(serializers.Serializer):
+    restaurant_id = serializers.IntegerField(read_only=True)
+    restaurant_name = serializers.CharField(read_only=True)
+    total_votes = serializers.FloatField(source="votes", read_only=True)
+    total_voter_count = serializers.IntegerField(
+        source="voters",
+        read_only=True,
+        help_text="sum of each day's voters over the range"
+    )
+
+
+class RestaurantHistorySerializer(serializers.Serializer):
+    winners = RestaurantWinnerSerializer(many=True, read_only=True)
+    totals = RestaurantTotalSerializer(many=True, read_only=True)
+
+
 class DateSerializer(serializers.Serializer):
     date = serializers.DateField(format="%Y-%m-%d")
+
+
+class RankOrderSerializer(serializers.Serializer):
+    ORDER_BY_VOTES = "votes"
+    ORDER_BY_VOTERS = "voters"
+
+    order = serializers.ChoiceField(
+        choices=[ORDER_BY_VOTES, ORDER_BY_VOTERS],
+        default=ORDER_BY_VOTES,
+        help_text=(
+            "rank by total votes and break ties on voters, or the reverse"
+        )
+    )
+
+
+class LeaderboardSerializer(RankOrderSerializer):
+    date = serializers.DateField(format="%Y-%m-%d", required=False)
+    limit = serializers.IntegerField(
+        default=10, min_value=1, max_value=100
+    )
+
+
+class SearchSerializer(serializers.Serializer):
+    q = serializers.CharField(
+        max_length=128, help_text="start of the restaurant name"
+    )
+    limit = serializers.IntegerField(
+        default=10, min_value=1, max_value=50
+    )
+
+
+class DateRangeSerializer(RankOrderSerializer):
+    MAX_DAYS = 366
+
+    start = serializers.DateField(format="%Y-%m-%d")
+    end = serializers.DateField(format="%Y-%m-%d")
+
+    def validate(self, attrs):
+        days = (attrs["end"] - attrs["start"]).days
+        if days < 0:
+            raise serializers.ValidationError(
+                {"end": "end must not be before start"}
+            )
+        if days >= self.MAX_DAYS:
+            raise serializers.ValidationError(
+                {"end": f"range cannot exceed {self.MAX_DAYS} days"}
+            )
+        return attrs
+
+
+class VoteExportSerializer(serializers.Serializer):
+    start = serializers.DateField(format="%Y-%m-%d")
+    end = serializers.DateField(format="%Y-%m-%d")
+    type = serializers.ChoiceField(
+        choices=list(export.WRITERS),
+        default=export.CSV,
+        help_text="csv with a header row, or one JSON object per line"
+    )
+
+    def validate(self, attrs):
+        if attrs["end"] < attrs["start"]:
+            raise serializers.ValidationError(
+                {"end": "end must not be before start"}
+            )
+        return attrs
+
+
+class RestaurantImportSerializer(serializers.Serializer):
+    file = serializers.FileField(
+        help_text="UTF-8 CSV with a name column, or JSONL with a name key"
+    )
+    type = serializers.ChoiceField(
+        choices=list(imports.READERS), default=imports.CSV
+    )
+
+
+class RestaurantImportReportSerializer(serializers.Serializer):
+    inserted = serializers.IntegerField(read_only=True)
+    skipped = serializers.IntegerField(
+        read_only=True,
+        help_text="empty, too long, repeated or already existing names"
+    )
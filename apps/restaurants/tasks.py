@@ -0,0 +1,25 @@
+from datetime import date
+
+from besteats.celery import app
+
+from apps.profiles.models import Profile
+from apps.restaurants.caching import bump_most_voted
+from apps.restaurants.leaderboard import get_leaderboard
+
+
+@app.task()
+def reconcile_leaderboard(date_to_reconcile: str = None):
+    """
+    Rebuild the leaderboard for the ISO date (defaults to today in every
+    profile timezone) from the votes in the database, expiring the cached
+    most voted restaurants.
+    """
+    if date_to_reconcile:
+        dates = {date.fromisoformat(date_to_reconcile)}
+    else:
+        dates = Profile.objects.local_dates()
+
+    leaderboard = get_leaderboard()
+    for date_to_reconcile in sorted(dates):
+        leaderboard.reconcile(date_to_reconcile)
+        bump_most_voted(date_to_reconcile)
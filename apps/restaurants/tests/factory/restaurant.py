@@ -19,4 +19,3 @@ class RestaurantVoteFactory(factory.django.DjangoModelFactory):
     profile = factory.SubFactory(ProfileFactory)
     restaurant = factory.SubFactory(RestaurantFactory)
     date = factory.sequence(lambda n: date(2024, 9, 1) + timedelta(days=n))
-    total = 0
@@ -0,0 +1,81 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+
+from apps.authentication.tests.factory.user import UserFactory
+from apps.restaurants.serializers import (
+    RestaurantMostVotedSerializer,
+    RestaurantSerializer
+)
+from apps.restaurants.models import Restaurant
+from apps.restaurants.tests.factory.restaurant import RestaurantFactory
+from apps.utils.renderers import ORJSONRenderer
+from apps.utils.serializers import flat_representation
+from apps.utils.tests.cases import BaseTestCase
+
+
+URL = "/api/restaurants"
+
+
+class FastPathTests(BaseTestCase):
+    """
+    Tests for the values() serialization and orjson rendering of the list
+    endpoints
+    """
+
+    def test_list_matches_serializer(self):
+        RestaurantFactory(name="Maxines")
+        RestaurantFactory(name="Brunos")
+
+        response = self.api_client.get(URL)
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+
+        self.assertEqual(
+            data["results"],
+            RestaurantSerializer(
+                Restaurant.objects.order_by("id"),
+                many=True,
+                context={"request": None}
+            ).data
+        )
+
+    def test_most_voted_matches_serializer(self):
+        rows = [{
+            "restaurant_id": 1,
+            "restaurant_name": "Maxines",
+            "total_votes": Decimal("1.5"),
+            "total_voter_count": 2,
+        }]
+        self.assertEqual(
+            flat_representation(RestaurantMostVotedSerializer, rows),
+            RestaurantMostVotedSerializer(rows, many=True).data
+        )
+
+        user = UserFactory()
+        self.force_login(user)
+        restaurant = RestaurantFactory(name="Maxines")
+        self.api_client.post(f"{URL}/{restaurant.pk}/vote")
+        response = self.api_client.get(f"{URL}/most_voted")
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual(data, [{
+            "restaurant_id": restaurant.pk,
+            "restaurant_name": "Maxines",
+            "total_votes": 1.0,
+            "total_voter_count": 1,
+        }])
+
+    def test_renderer_matches_json_renderer(self):
+        data = {
+            "name": "Maxines\u2028",
+            "total": Decimal("1.5"),
+            "date": date(2024, 2, 1),
+            "created": datetime(2024, 2, 1, 12, 0, 0, 123456, timezone.utc),
+            "ids": [1, 2, None],
+            "errors": {0: ["A valid integer is required."]},
+        }
+        self.assertEqual(
+            ORJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+        self.assertEqual(ORJSONRenderer().render(None), b"")
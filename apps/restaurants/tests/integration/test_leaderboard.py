@@ -0,0 +1,180 @@
+from unittest.mock import patch
+
+from django.test import override_settings
+from django.utils.timezone import localdate
+
+from django_redis import get_redis_connection
+from rest_framework import status
+
+from apps.authentication.tests.factory.user import UserFactory
+from apps.restaurants.leaderboard import RedisLeaderboard
+from apps.restaurants.models import RestaurantVoteTally
+from apps.restaurants.tasks import reconcile_leaderboard
+from apps.restaurants.tests.factory.restaurant import RestaurantFactory
+from apps.utils.tests.cases import BaseTestCase
+
+
+URL = "/api/restaurants"
+
+
+@override_settings(
+    LEADERBOARD_BACKEND="apps.restaurants.leaderboard.RedisLeaderboard"
+)
+class RedisLeaderboardTests(BaseTestCase):
+    """
+    Tests for most_voted served from the Redis sorted sets
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = UserFactory()
+        self.user_2 = UserFactory()
+
+        self.restaurant_1 = RestaurantFactory(name="Maxines")
+        self.restaurant_2 = RestaurantFactory(name="Brunos")
+
+        self.leaderboard = RedisLeaderboard()
+        self.total_key, self.voters_key = self.leaderboard.keys(localdate())
+
+    def vote(self, user, restaurant, action="vote"):
+        self.force_login(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api_client.post(
+                f"{URL}/{restaurant.pk}/{action}"
+            )
+        self.assertStatusCode(response, status.HTTP_200_OK)
+
+    def most_voted(self):
+        response = self.api_client.get(f"{URL}/most_voted")
+        return self.assertStatusCode(response, status.HTTP_200_OK)
+
+    def test_votes_update_sorted_sets(self):
+        for _ in range(3):
+            self.vote(self.user, self.restaurant_1)
+        self.vote(self.user_2, self.restaurant_1)
+        self.vote(self.user_2, self.restaurant_2)
+        self.vote(self.user_2, self.restaurant_2, action="unvote")
+
+        redis = get_redis_connection("default")
+        self.assertEqual(
+            redis.zscore(self.total_key, self.restaurant_1.pk), 2.75
+        )
+        self.assertEqual(
+            redis.zscore(self.voters_key, self.restaurant_1.pk), 2
+        )
+        self.assertEqual(redis.zscore(self.total_key, self.restaurant_2.pk), 0)
+
+        with self.assertNumQueries(1):
+            data = self.most_voted()
+
+        self.assertEqual(data, [{
+            "restaurant_id": self.restaurant_1.pk,
+            "restaurant_name": "Maxines",
+            "total_votes": 2.75,
+            "total_voter_count": 2,
+        }])
+
+    def test_reconcile_after_flush(self):
+        self.vote(self.user, self.restaurant_1)
+        self.vote(self.user_2, self.restaurant_2)
+        self.vote(self.user_2, self.restaurant_2)
+
+        get_redis_connection("default").flushdb()
+
+        # missing sets fall back to the database
+        data = self.most_voted()
+        self.assertEqual(data[0]["restaurant_id"], self.restaurant_2.pk)
+
+        reconcile_leaderboard()
+
+        with self.assertNumQueries(1):
+            data = self.most_voted()
+        self.assertEqual(data[0]["restaurant_id"], self.restaurant_2.pk)
+        self.assertEqual(data[0]["total_votes"], 1.5)
+
+        # votes after a flush rebuild the sets rather than start from zero
+        get_redis_connection("default").flushdb()
+        self.vote(self.user, self.restaurant_2)
+
+        data = self.most_voted()
+        self.assertEqual(data[0]["restaurant_id"], self.restaurant_2.pk)
+        self.assertEqual(data[0]["total_votes"], 2.5)
+        self.assertEqual(data[0]["total_voter_count"], 2)
+
+    def test_bulk_vote_updates_sorted_sets(self):
+        self.vote(self.user, self.restaurant_1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api_client.post(f"{URL}/votes", {
+                "votes": [
+                    {"restaurant": self.restaurant_1.pk, "count": 2},
+                    {"restaurant": self.restaurant_2.pk, "count": 1},
+                ]
+            }, format="json")
+        self.assertStatusCode(response, status.HTTP_200_OK)
+
+        redis = get_redis_connection("default")
+        self.assertEqual(
+            redis.zscore(self.total_key, self.restaurant_1.pk), 1.75
+        )
+        self.assertEqual(
+            redis.zscore(self.voters_key, self.restaurant_1.pk), 1
+        )
+        self.assertEqual(
+            redis.zscore(self.total_key, self.restaurant_2.pk), 1
+        )
+
+    def test_bulk_vote_rebuilds_missing_sets_once(self):
+        get_redis_connection("default").flushdb()
+        self.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api_client.post(f"{URL}/votes", {
+                "votes": [
+                    {"restaurant": self.restaurant_1.pk, "count": 2},
+                    {"restaurant": self.restaurant_2.pk, "count": 1},
+                ]
+            }, format="json")
+        self.assertStatusCode(response, status.HTTP_200_OK)
+
+        # the first vote of the day rebuilds the sets from the database,
+        # the batch must not be added on top of them
+        redis = get_redis_connection("default")
+        self.assertEqual(
+            redis.zscore(self.total_key, self.restaurant_1.pk), 1.5
+        )
+        self.assertEqual(
+            redis.zscore(self.voters_key, self.restaurant_1.pk), 1
+        )
+        self.assertEqual(
+            redis.zscore(self.total_key, self.restaurant_2.pk), 1
+        )
+        self.assertEqual(
+            redis.zscore(self.voters_key, self.restaurant_2.pk), 1
+        )
+
+    def test_reconcile_rereads_votes_added_during_rebuild(self):
+        self.vote(self.user, self.restaurant_1)
+        aggregates = RestaurantVoteTally.objects.aggregates
+        reads = []
+
+        def vote_after_read(date):
+            tallies = list(aggregates(date))
+            if not reads:
+                # committed and added to the sets after the first read
+                self.vote(self.user_2, self.restaurant_2)
+            reads.append(tallies)
+            return tallies
+
+        with patch.object(
+            RestaurantVoteTally.objects,
+            "aggregates",
+            side_effect=vote_after_read
+        ):
+            self.leaderboard.reconcile(localdate())
+
+        self.assertEqual(len(reads), 2)
+        redis = get_redis_connection("default")
+        self.assertEqual(redis.zscore(self.total_key, self.restaurant_2.pk), 1)
+        self.assertEqual(
+            redis.zscore(self.voters_key, self.restaurant_2.pk), 1
+        )
@@ -0,0 +1,148 @@
+from datetime import date, datetime, timezone
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework import status
+
+from apps.authentication.tests.factory.user import UserFactory
+from apps.profiles.models import Profile
+from apps.restaurants.models import Restaurant
+from apps.restaurants.tests.factory.restaurant import (
+    RestaurantFactory,
+    RestaurantVoteFactory
+)
+from apps.utils.tests.cases import BaseTestCase
+
+
+URL = "/api/restaurants"
+
+
+class KeysetPaginationTests(BaseTestCase):
+    """
+    Tests for the cursor paginated restaurant and vote listings
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = UserFactory()
+        self.restaurants = [
+            RestaurantFactory(name=name)
+            for name in ["Maxines", "Brunos", "Valaries", "Castello", "Piet"]
+        ]
+
+    def test_restaurant_offset_pages_by_default(self):
+        response = self.api_client.get(URL, {"limit": 2, "offset": 2})
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+
+        self.assertEqual(data["count"], 5)
+        self.assertEqual(
+            [restaurant["id"] for restaurant in data["results"]],
+            [restaurant.pk for restaurant in self.restaurants[2:4]]
+        )
+
+    def test_restaurant_pages(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api_client.get(
+                URL, {"limit": 2, "pagination": "cursor"}
+            )
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+
+        self.assertNotIn("count", data)
+        self.assertFalse(
+            any("COUNT(" in query["sql"] for query in queries.captured_queries)
+        )
+        self.assertEqual(
+            [restaurant["id"] for restaurant in data["results"]],
+            [restaurant.pk for restaurant in self.restaurants[:2]]
+        )
+
+        response = self.api_client.get(data["next"])
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual(
+            [restaurant["id"] for restaurant in data["results"]],
+            [restaurant.pk for restaurant in self.restaurants[2:4]]
+        )
+        self.assertIsNotNone(data["previous"])
+
+    def test_approximate_count(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE restaurants_restaurant")
+
+        response = self.api_client.get(
+            URL, {"count": "approximate", "pagination": "cursor"}
+        )
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual(data["count"], 5)
+
+    def test_ordering_ties_broken_by_id(self):
+        Restaurant.objects.update(
+            created=datetime(2024, 3, 1, tzinfo=timezone.utc)
+        )
+
+        ids = []
+        url, params = URL, {
+            "limit": 2, "pagination": "cursor", "ordering": "created"
+        }
+        while url:
+            response = self.api_client.get(url, params)
+            data = self.assertStatusCode(response, status.HTTP_200_OK)
+            ids += [restaurant["id"] for restaurant in data["results"]]
+            url, params = data["next"], None
+
+        self.assertEqual(
+            ids, [restaurant.pk for restaurant in self.restaurants]
+        )
+
+    def test_vote_history(self):
+        first, second, third = self.restaurants[:3]
+        RestaurantVoteFactory(
+            profile=self.user.profile, restaurant=first, date=date(2024, 3, 1)
+        )
+        RestaurantVoteFactory(
+            profile=self.user.profile, restaurant=second, date=date(2024, 3, 2)
+        )
+        RestaurantVoteFactory(
+            profile=UserFactory().profile,
+            restaurant=third,
+            date=date(2024, 3, 2)
+        )
+        self.force_login(self.user)
+
+        response = self.api_client.get(f"{URL}/votes/history", {"limit": 1})
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual(data["results"][0]["restaurant"]["id"], second.pk)
+
+        response = self.api_client.get(data["next"])
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual(data["results"][0]["restaurant"]["id"], first.pk)
+        self.assertIsNone(data["next"])
+
+    def test_vote_history_queries_constant(self):
+        # daily votes from an earlier day make the profile read the config
+        Profile.objects.filter(pk=self.user.profile.pk).update(
+            votes_date=date(2024, 3, 1)
+        )
+        RestaurantVoteFactory(
+            profile=self.user.profile,
+            restaurant=self.restaurants[0],
+            date=date(2024, 3, 1)
+        )
+        self.force_login(self.user)
+
+        def grow():
+            for day in range(2, 12):
+                for restaurant in self.restaurants:
+                    RestaurantVoteFactory(
+                        profile=self.user.profile,
+                        restaurant=restaurant,
+                        date=date(2024, 3, day)
+                    )
+
+        self.assertQueriesConstant(
+            lambda: self.api_client.get(f"{URL}/votes/history"), grow
+        )
+
+    def test_vote_history_anonymous(self):
+        response = self.api_client.get(f"{URL}/votes/history")
+        self.assertStatusCode(response, status.HTTP_401_UNAUTHORIZED)
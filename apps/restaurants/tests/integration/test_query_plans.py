@@ -0,0 +1,125 @@
+import re
+
+from datetime import date
+from typing import Callable
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework import status
+
+from apps.authentication.tests.factory.user import UserFactory
+from apps.restaurants import export
+from apps.restaurants.leaderboard import DatabaseLeaderboard
+from apps.restaurants.models import RestaurantVote, RestaurantVoteTally
+from apps.restaurants.tests.factory.restaurant import (
+    RestaurantFactory,
+    RestaurantVoteFactory
+)
+from apps.utils.tests.cases import BaseTestCase
+
+
+URL = "/api/restaurants"
+
+STATEMENTS = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+# The query behind a server-side cursor, e.g. QuerySet.iterator()
+DECLARE_CURSOR = re.compile(r"^DECLARE .+? CURSOR .*?FOR ")
+
+
+class QueryPlanTests(BaseTestCase):
+    """
+    EXPLAIN every query of the hot vote paths with sequential scans
+    disabled, so a query no index serves shows up as a Seq Scan
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = UserFactory()
+        self.restaurant = RestaurantFactory(name="Maxines")
+        self.date = date(2024, 2, 1)
+        for restaurant in (self.restaurant, RestaurantFactory()):
+            RestaurantVoteFactory(
+                profile=self.user.profile,
+                restaurant=restaurant,
+                date=self.date,
+                count=2
+            )
+        self.force_login(self.user)
+
+    def assertIndexed(self, run: Callable, *indexes: str):
+        """
+        Assert no query run makes plans a sequential scan, and that the
+        plans use indexes.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            run()
+
+        plans = []
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            for query in queries.captured_queries:
+                sql = DECLARE_CURSOR.sub("", query["sql"].lstrip())
+                if not sql.upper().startswith(STATEMENTS):
+                    continue
+                cursor.execute(f"EXPLAIN {sql}")
+                plans.append("\n".join(row[0] for row in cursor.fetchall()))
+        plan = "\n\n".join(plans)
+
+        self.assertTrue(plans)
+        self.assertNotIn("Seq Scan", plan, plan)
+        for index in indexes:
+            self.assertIn(index, plan, plan)
+
+    def test_vote(self):
+        def vote():
+            for action in ("vote", "unvote"):
+                response = self.api_client.post(
+                    f"{URL}/{self.restaurant.pk}/{action}"
+                )
+                self.assertStatusCode(response, status.HTTP_200_OK)
+
+        self.assertIndexed(vote, "unique_restaurant_vote")
+
+    def test_most_voted_and_ranking(self):
+        leaderboard = DatabaseLeaderboard()
+        self.assertIndexed(
+            lambda: leaderboard.most_voted(self.date),
+            "tally_date_voter_count_idx",
+            "tally_date_total_votes_idx",
+        )
+        self.assertIndexed(
+            lambda: leaderboard.ranking(self.date, 10), "tally_date_"
+        )
+
+    def test_daily_aggregates(self):
+        self.assertIndexed(
+            lambda: list(RestaurantVoteTally.objects.aggregates(self.date)),
+            "vote_date_restaurant_cover_idx",
+        )
+        self.assertIndexed(
+            lambda: RestaurantVoteTally.objects.refresh(
+                self.date, self.restaurant.pk
+            )
+        )
+
+    def test_restaurant_history(self):
+        self.assertIndexed(
+            lambda: list(
+                RestaurantVote.objects
+                .filter(restaurant=self.restaurant)
+                .order_by("-date")[:30]
+            ),
+            "vote_restaurant_date_idx",
+        )
+
+    def test_vote_history(self):
+        self.assertIndexed(
+            lambda: self.api_client.get(f"{URL}/votes/history"),
+            "vote_profile_id_idx",
+        )
+
+    def test_export(self):
+        self.assertIndexed(
+            lambda: list(export.rows(self.date, self.date)),
+        )
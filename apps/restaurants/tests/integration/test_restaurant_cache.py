@@ -0,0 +1,229 @@
+from datetime import date
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test import override_settings
+
+from rest_framework import status
+
+from apps.authentication.tests.factory.user import UserFactory
+from apps.restaurants import caching
+from apps.restaurants.tests.factory.restaurant import (
+    RestaurantFactory,
+    RestaurantVoteFactory
+)
+from apps.utils.tests.cases import BaseTestCase
+
+
+URL = "/api/restaurants"
+
+
+class RestaurantCacheTests(BaseTestCase):
+    """
+    Tests for the cached restaurant list and detail responses
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = UserFactory()
+        self.restaurant = RestaurantFactory(
+            name="Maxines", profile=self.user.profile
+        )
+        RestaurantFactory(name="Brunos")
+
+    def write(self, method: str, path: str = "", data: dict = None):
+        self.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = getattr(self.api_client, method)(f"{URL}{path}", data)
+        self.api_client.force_authenticate(None)
+        return response
+
+    def test_list_cached(self):
+        response = self.api_client.get(URL)
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+        etag = response.headers["ETag"]
+        self.assertIn("Last-Modified", response.headers)
+
+        with self.assertNumQueries(0):
+            response = self.api_client.get(URL)
+        self.assertEqual(
+            self.assertStatusCode(response, status.HTTP_200_OK), data
+        )
+        self.assertEqual(response.headers["ETag"], etag)
+
+        # other params are cached apart
+        response = self.api_client.get(URL, {"ordering": "-id"})
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual(data["results"][-1]["name"], "Maxines")
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_unknown_params_share_entry(self):
+        self.api_client.get(URL)
+
+        with self.assertNumQueries(0):
+            response = self.api_client.get(URL, {"x": "random"})
+        self.assertStatusCode(response, status.HTTP_200_OK)
+
+    def test_not_modified(self):
+        response = self.api_client.get(URL)
+        etag = response.headers["ETag"]
+        last_modified = response.headers["Last-Modified"]
+
+        with self.assertNumQueries(0):
+            response = self.api_client.get(URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.headers["ETag"], etag)
+
+        response = self.api_client.get(
+            URL, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_write_invalidates_list(self):
+        response = self.api_client.get(URL)
+        etag = response.headers["ETag"]
+
+        response = self.write("post", data={"name": "Valaries"})
+        self.assertStatusCode(response, status.HTTP_201_CREATED)
+
+        response = self.api_client.get(URL, HTTP_IF_NONE_MATCH=etag)
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual(len(data["results"]), 3)
+
+    @override_settings(ALLOWED_HOSTS=["testserver", "api.example.com"])
+    def test_list_cached_per_host(self):
+        for host in ("testserver", "api.example.com"):
+            response = self.api_client.get(URL, {"limit": 1}, HTTP_HOST=host)
+            data = self.assertStatusCode(response, status.HTTP_200_OK)
+            self.assertTrue(data["next"].startswith(f"http://{host}/"))
+
+    def test_stale_render_not_served(self):
+        """
+        a render that read the row before a write commits cannot cache it
+        """
+        path = f"{URL}/{self.restaurant.pk}"
+        key = caching.detail_key(self.restaurant.pk)
+        stale = {"data": {"name": "Maxines"}, "etag": '"stale"'}
+
+        self.write("patch", f"/{self.restaurant.pk}", {"name": "Castello"})
+        cache.set(key, {**stale, "last_modified": 0})
+
+        response = self.api_client.get(path)
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual(data["name"], "Castello")
+
+    def test_detail_cached_and_invalidated(self):
+        path = f"{URL}/{self.restaurant.pk}"
+        response = self.api_client.get(path)
+        etag = response.headers["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.api_client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.write("patch", f"/{self.restaurant.pk}", {"name": "Castello"})
+
+        response = self.api_client.get(path, HTTP_IF_NONE_MATCH=etag)
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual(data["name"], "Castello")
+
+        self.write("delete", f"/{self.restaurant.pk}")
+
+        response = self.api_client.get(path)
+        self.assertStatusCode(response, status.HTTP_404_NOT_FOUND)
+
+
+class MostVotedCacheTests(BaseTestCase):
+    """
+    Tests for the cached most_voted results
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = UserFactory()
+        self.restaurant_1 = RestaurantFactory(name="Maxines")
+        self.restaurant_2 = RestaurantFactory(name="Brunos")
+        self.force_login(self.user)
+
+    def vote(self, restaurant):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api_client.post(f"{URL}/{restaurant.pk}/vote")
+        self.assertStatusCode(response, status.HTTP_200_OK)
+
+    def most_voted(self, **params):
+        response = self.api_client.get(f"{URL}/most_voted", params)
+        return self.assertStatusCode(response, status.HTTP_200_OK)
+
+    def test_votes_expire_today(self):
+        self.vote(self.restaurant_1)
+        self.assertEqual(
+            self.most_voted()[0]["restaurant_id"], self.restaurant_1.pk
+        )
+
+        with self.assertNumQueries(0):
+            self.most_voted()
+
+        self.vote(self.restaurant_2)
+        self.vote(self.restaurant_2)
+        self.assertEqual(
+            self.most_voted()[0]["restaurant_id"], self.restaurant_2.pk
+        )
+
+    def test_past_dates_kept(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            RestaurantVoteFactory(
+                profile=self.user.profile,
+                restaurant=self.restaurant_1,
+                date=date(2024, 2, 1),
+                count=2
+            )
+
+        data = self.most_voted(date="2024-02-01")
+        self.assertEqual(data[0]["total_votes"], 1.5)
+
+        version = cache.get(caching.most_voted_version_key(date(2024, 2, 1)))
+        self.assertIsNone(cache.ttl(f"most-voted:2024-02-01:{version}"))
+
+    def test_rename_expires_past_dates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            RestaurantVoteFactory(
+                profile=self.user.profile,
+                restaurant=self.restaurant_1,
+                date=date(2024, 2, 1)
+            )
+        self.most_voted(date="2024-02-01")
+
+        # saves that keep the name keep the cache
+        with self.captureOnCommitCallbacks(execute=True):
+            self.restaurant_1.save()
+        with self.assertNumQueries(0):
+            self.most_voted(date="2024-02-01")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.restaurant_1.name = "Castello"
+            self.restaurant_1.save()
+
+        data = self.most_voted(date="2024-02-01")
+        self.assertEqual(data[0]["restaurant_name"], "Castello")
+
+    def test_single_flight(self):
+        """
+        requests that find another one recomputing wait for its result
+        """
+        key = "most-voted:test"
+        compute = Mock(return_value=["computed"])
+        cache.add(f"{key}:lock", 1)
+
+        def finish_elsewhere(seconds):
+            cache.set(key, ["elsewhere"])
+
+        with patch.object(caching.time, "sleep", finish_elsewhere):
+            value = caching.single_flight(key, compute, 60)
+
+        self.assertEqual(value, ["elsewhere"])
+        compute.assert_not_called()
+
+        cache.delete_many([key, f"{key}:lock"])
+        self.assertEqual(caching.single_flight(key, compute, 60), ["computed"])
+        compute.assert_called_once()
+        self.assertIsNone(cache.get(f"{key}:lock"))
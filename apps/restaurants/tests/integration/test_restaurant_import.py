@@ -0,0 +1,129 @@
+import json
+import tempfile
+
+from io import StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+
+from rest_framework import status
+
+from apps.authentication.tests.factory.user import UserFactory
+from apps.restaurants.models import Restaurant
+from apps.restaurants.tests.factory.restaurant import RestaurantFactory
+from apps.utils.tests.cases import BaseTestCase
+
+
+URL = "/api/restaurants/import"
+
+
+class RestaurantImportTests(BaseTestCase):
+    """
+    Tests for the COPY based restaurant import endpoint and command
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.staff = UserFactory(is_staff=True)
+        RestaurantFactory(name="Maxines")
+
+    def upload(self, content, **data):
+        self.force_login(self.staff)
+        if isinstance(content, str):
+            content = content.encode()
+        data["file"] = SimpleUploadedFile("names", content)
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.api_client.post(URL, data, format="multipart")
+
+    def test_csv(self):
+        response = self.api_client.get("/api/restaurants")
+        etag = response.headers["ETag"]
+
+        response = self.upload(
+            "name,city\n"
+            "Brunos,Amsterdam\n"
+            "  brunos ,Utrecht\n"
+            "MAXINES,Amsterdam\n"
+            ",Rotterdam\n"
+            f"{'x' * 129},Delft\n"
+            "\"Valaries, Bar\",Leiden\n"
+        )
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+
+        self.assertEqual(data, {"inserted": 2, "skipped": 4})
+        self.assertEqual(
+            sorted(Restaurant.objects.values_list("name", flat=True)),
+            ["Brunos", "Maxines", "Valaries, Bar"]
+        )
+        self.assertEqual(
+            Restaurant.objects.get(name="Brunos").profile,
+            self.staff.profile
+        )
+
+        response = self.api_client.get(
+            "/api/restaurants", HTTP_IF_NONE_MATCH=etag
+        )
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual(len(data["results"]), 3)
+
+    def test_jsonl(self):
+        response = self.upload(
+            json.dumps({"name": "Brunos"}) + "\n\n"
+            + json.dumps({"name": "Castello"}) + "\n",
+            type="jsonl"
+        )
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual(data, {"inserted": 2, "skipped": 0})
+
+        response = self.upload("{\"title\": \"Brunos\"}\n", type="jsonl")
+        self.assertStatusCode(response, status.HTTP_400_BAD_REQUEST)
+
+    def test_jsonl_names_not_text(self):
+        for name in (None, 42, {"text": "Brunos"}):
+            response = self.upload(
+                json.dumps({"name": "Castello"}) + "\n"
+                + json.dumps({"name": name}) + "\n",
+                type="jsonl"
+            )
+            data = self.assertStatusCode(
+                response, status.HTTP_400_BAD_REQUEST
+            )
+            self.assertIn("Line 2", data["detail"])
+        self.assertEqual(Restaurant.objects.count(), 1)
+
+    def test_unreadable(self):
+        for content, file_format in (
+            ("name\nCafé\n".encode("latin-1"), "csv"),
+            ("{\"name\": \"Café\"}\n".encode("latin-1"), "jsonl"),
+            (f"name\n\"{'x' * 200000}\"\n", "csv"),
+        ):
+            response = self.upload(content, type=file_format)
+            self.assertStatusCode(response, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Restaurant.objects.count(), 1)
+
+    def test_staff_only(self):
+        self.force_login(UserFactory())
+        response = self.api_client.post(
+            URL,
+            {"file": SimpleUploadedFile("names", b"name\nBrunos\n")},
+            format="multipart"
+        )
+        self.assertStatusCode(response, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Restaurant.objects.count(), 1)
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl") as file:
+            file.write("{\"name\": \"Brunos\"}\n{\"name\": \"maxines\"}\n")
+            file.flush()
+            out = StringIO()
+            call_command("import_restaurants", file.name, stdout=out)
+
+        self.assertEqual(
+            out.getvalue(), "Inserted 1 restaurants, skipped 1\n"
+        )
+
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as file:
+            file.write("title\nBrunos\n")
+            file.flush()
+            with self.assertRaises(CommandError):
+                call_command("import_restaurants", file.name)
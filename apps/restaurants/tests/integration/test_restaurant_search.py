@@ -0,0 +1,56 @@
+from django.db import connection
+
+from rest_framework import status
+
+from apps.restaurants.models import Restaurant
+from apps.restaurants.tests.factory.restaurant import RestaurantFactory
+from apps.utils.tests.cases import BaseTestCase
+
+
+URL = "/api/restaurants/search"
+
+
+class RestaurantSearchTests(BaseTestCase):
+    """
+    Tests for the restaurant name typeahead
+    """
+
+    def setUp(self):
+        super().setUp()
+        for name in ["Maxines Burger", "maxines", "Max", "Brunos", "Mamma"]:
+            RestaurantFactory(name=name)
+
+    def search(self, **params):
+        response = self.api_client.get(URL, params)
+        return self.assertStatusCode(response, status.HTTP_200_OK)
+
+    def test_prefix_ranked(self):
+        data = self.search(q="MAX")
+        self.assertEqual(
+            [restaurant["name"] for restaurant in data],
+            ["Max", "maxines", "Maxines Burger"]
+        )
+
+        data = self.search(q="max", limit=2)
+        self.assertEqual(len(data), 2)
+
+        self.assertEqual(self.search(q="%"), [])
+
+    def test_invalid_query(self):
+        response = self.api_client.get(URL)
+        self.assertStatusCode(response, status.HTTP_400_BAD_REQUEST)
+
+        response = self.api_client.get(URL, {"q": "max", "limit": 500})
+        self.assertStatusCode(response, status.HTTP_400_BAD_REQUEST)
+
+    def test_uses_index(self):
+        restaurants = Restaurant.objects.search("max")[:10]
+        with connection.cursor() as cursor:
+            # a handful of rows would otherwise be read whole
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_bitmapscan = off")
+        plan = restaurants.explain()
+
+        # the index both finds and orders the matches
+        self.assertIn("Index Scan using restaurant_name_search_idx", plan)
+        self.assertNotIn("Sort", plan)
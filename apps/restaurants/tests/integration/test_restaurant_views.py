@@ -2,12 +2,14 @@ from datetime import date
 from unittest.mock import patch
 
 from django_celery_beat.models import PeriodicTask, CrontabSchedule
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from freezegun import freeze_time
 from rest_framework import status
 
-from apps.restaurants.models import RestaurantVote
+from apps.restaurants.models import RestaurantVote, RestaurantVoteTally
 from apps.restaurants.tests.factory.restaurant import (
     RestaurantFactory,
     RestaurantVoteFactory
@@ -276,6 +278,201 @@ class RestaurantTests(BaseTestCase):
         rest_1_vote = RestaurantVote.objects.get(restaurant=self.restaurant_1)
         self.assertEqual(rest_1_vote.total, 0)
 
+    def test_vote_single_statement(self):
+        """
+        a vote, its daily votes and the restaurant the response shows are
+        one statement.
+        """
+        with self.assertNumQueries(1):
+            response = self.api_client.post(
+                f"{URL}/{self.restaurant_1.pk}/vote"
+            )
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+
+        self.assertEqual(data["count"], 1)
+        self.assertEqual(data["total"], 1)
+        self.assertEqual(data["profile"]["daily_votes"], 9)
+
+        self.user.profile.refresh_from_db()
+        self.assertEqual(self.user.profile.daily_votes, 9)
+
+    def test_vote_missing_restaurant(self):
+        """
+        voting for a restaurant that does not exist should not spend a vote
+        """
+        response = self.api_client.post(f"{URL}/0/vote")
+        self.assertStatusCode(response, status.HTTP_404_NOT_FOUND)
+
+        response = self.api_client.post(f"{URL}/0/unvote")
+        self.assertStatusCode(response, status.HTTP_404_NOT_FOUND)
+
+        # beyond the bigint range
+        for action in ("vote", "unvote"):
+            response = self.api_client.post(
+                f"{URL}/99999999999999999999/{action}"
+            )
+            self.assertStatusCode(response, status.HTTP_404_NOT_FOUND)
+
+        self.user.profile.refresh_from_db()
+        self.assertEqual(self.user.profile.daily_votes, 10)
+        self.assertFalse(RestaurantVote.objects.exists())
+
+    def test_bulk_vote(self):
+        """
+        votes spread over restaurants in one request are weighted as if they
+        were cast one at a time
+        """
+        self.api_client.post(f"{URL}/{self.restaurant_1.pk}/vote")
+
+        with self.assertNumQueries(1):
+            response = self.api_client.post(f"{URL}/votes", {
+                "votes": [
+                    {"restaurant": self.restaurant_1.pk, "count": 3},
+                    {"restaurant": self.restaurant_2.pk, "count": 2},
+                    {"restaurant": self.restaurant_3.pk},
+                ]
+            }, format="json")
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+
+        self.assertEqual(
+            [(vote["count"], vote["total"]) for vote in data],
+            [(4, 2.0), (2, 1.5), (1, 1.0)]
+        )
+        self.assertEqual(data[0]["restaurant"]["name"], "Maxines")
+        self.assertEqual(self.user.profile.daily_votes, 3)
+
+        tally = RestaurantVoteTally.objects.get(restaurant=self.restaurant_1)
+        self.assertEqual(tally.total_votes, 2.0)
+        self.assertEqual(tally.voter_count, 1)
+
+        self.user.profile.refresh_from_db()
+        self.assertEqual(self.user.profile.daily_votes, 3)
+
+    def test_bulk_vote_all_or_nothing(self):
+        # more votes than the user has left
+        response = self.api_client.post(f"{URL}/votes", {
+            "votes": [
+                {"restaurant": self.restaurant_1.pk, "count": 6},
+                {"restaurant": self.restaurant_2.pk, "count": 5},
+            ]
+        }, format="json")
+        data = self.assertStatusCode(response, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("You have run out of votes", data["detail"])
+
+        # a restaurant that does not exist
+        response = self.api_client.post(f"{URL}/votes", {
+            "votes": [
+                {"restaurant": self.restaurant_1.pk, "count": 1},
+                {"restaurant": 0, "count": 1},
+            ]
+        }, format="json")
+        self.assertStatusCode(response, status.HTTP_400_BAD_REQUEST)
+
+        response = self.api_client.post(f"{URL}/votes", {
+            "votes": [
+                {"restaurant": self.restaurant_1.pk, "count": 1},
+                {"restaurant": self.restaurant_3.pk + 100, "count": 1},
+            ]
+        }, format="json")
+        self.assertStatusCode(response, status.HTTP_404_NOT_FOUND)
+
+        # values the integer[] and bigint[] casts would reject
+        for vote in ({"restaurant": 2 ** 70}, {
+            "restaurant": self.restaurant_1.pk, "count": 3000000000
+        }):
+            response = self.api_client.post(
+                f"{URL}/votes", {"votes": [vote]}, format="json"
+            )
+            self.assertStatusCode(response, status.HTTP_400_BAD_REQUEST)
+
+        # the same restaurant twice
+        response = self.api_client.post(f"{URL}/votes", {
+            "votes": [
+                {"restaurant": self.restaurant_1.pk, "count": 1},
+                {"restaurant": self.restaurant_1.pk, "count": 1},
+            ]
+        }, format="json")
+        self.assertStatusCode(response, status.HTTP_400_BAD_REQUEST)
+
+        self.assertFalse(RestaurantVote.objects.exists())
+        self.user.profile.refresh_from_db()
+        self.assertEqual(self.user.profile.daily_votes, 10)
+
+    def test_vote_tally(self):
+        """
+        vote and unvote keep the restaurant's daily tally in step
+        """
+        for _ in range(3):
+            self.api_client.post(f"{URL}/{self.restaurant_1.pk}/vote")
+
+        self.force_login(self.user_2)
+        self.api_client.post(f"{URL}/{self.restaurant_1.pk}/vote")
+
+        tally = RestaurantVoteTally.objects.get(restaurant=self.restaurant_1)
+        self.assertEqual(tally.total_votes, 2.75)
+        self.assertEqual(tally.voter_count, 2)
+
+        # user_2 removing their only vote is no longer a voter
+        self.api_client.post(f"{URL}/{self.restaurant_1.pk}/unvote")
+        tally.refresh_from_db()
+        self.assertEqual(tally.total_votes, 1.75)
+        self.assertEqual(tally.voter_count, 1)
+
+        self.force_login(self.user)
+        self.api_client.post(f"{URL}/{self.restaurant_1.pk}/unvote")
+        tally.refresh_from_db()
+        self.assertEqual(tally.total_votes, 1.5)
+        self.assertEqual(tally.voter_count, 1)
+
+        # the incremental tally matches one rebuilt from the raw votes
+        RestaurantVoteTally.objects.rebuild(tally.date)
+        rebuilt = RestaurantVoteTally.objects.get(
+            restaurant=self.restaurant_1
+        )
+        self.assertEqual(rebuilt.total_votes, tally.total_votes)
+        self.assertEqual(rebuilt.voter_count, tally.voter_count)
+
+    def test_restaurant_delete_queries_constant(self):
+        """
+        votes deleted with their restaurant do not refresh its tally each
+        """
+        queries = []
+        for voters in (1, 5):
+            restaurant = RestaurantFactory(name=f"Voted by {voters}")
+            for _ in range(voters):
+                RestaurantVoteFactory(
+                    profile=UserFactory().profile,
+                    restaurant=restaurant,
+                    date=date(2024, 3, 1)
+                )
+
+            with CaptureQueriesContext(connection) as captured:
+                restaurant.delete()
+            queries.append(len(captured.captured_queries))
+
+        self.assertEqual(queries[0], queries[1])
+        self.assertFalse(RestaurantVoteTally.objects.exists())
+
+    def test_profile_delete_rebuilds_tally(self):
+        self.api_client.post(f"{URL}/{self.restaurant_1.pk}/vote")
+        self.force_login(self.user_2)
+        self.api_client.post(f"{URL}/{self.restaurant_1.pk}/vote")
+
+        self.user_2.profile.delete()
+
+        tally = RestaurantVoteTally.objects.get(restaurant=self.restaurant_1)
+        self.assertEqual(tally.voter_count, 1)
+        self.assertEqual(tally.total_votes, 2)
+
+    def test_most_voted_single_query(self):
+        self.api_client.post(f"{URL}/{self.restaurant_1.pk}/vote")
+
+        with self.assertNumQueries(1):
+            response = self.api_client.get(f"{URL}/most_voted")
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual(data[0]["restaurant_id"], self.restaurant_1.pk)
+        self.assertEqual(data[0]["restaurant_name"], self.restaurant_1.name)
+
     def test_most_voted_restaurant(self):
         """
         scenario: self.restaurant_2 should win because
@@ -366,18 +563,145 @@ class RestaurantTests(BaseTestCase):
         self.assertEqual(data[1]["total_votes"], 4.0)
         self.assertEqual(data[1]["total_voter_count"], 2)
 
+    def test_leaderboard(self):
+        """
+        scenario: self.restaurant_1 has the most points, self.restaurant_2
+        the most voters and self.restaurant_3 trails on both
+        """
+        for _ in range(5):
+            self.api_client.post(f"{URL}/{self.restaurant_1.pk}/vote")
+        self.api_client.post(f"{URL}/{self.restaurant_2.pk}/vote")
+
+        self.force_login(self.user_2)
+        self.api_client.post(f"{URL}/{self.restaurant_2.pk}/vote")
+        self.api_client.post(f"{URL}/{self.restaurant_3.pk}/vote")
+
+        # most_voted has no single winner on both counts
+        response = self.api_client.get(f"{URL}/most_voted")
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual(data, [])
+
+        response = self.api_client.get(f"{URL}/leaderboard")
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row["rank"], row["restaurant_id"]) for row in data],
+            [
+                (1, self.restaurant_1.pk),
+                (2, self.restaurant_2.pk),
+                (3, self.restaurant_3.pk),
+            ]
+        )
+        self.assertEqual(data[0]["total_votes"], 2.25)
+        self.assertEqual(data[0]["total_voter_count"], 1)
+
+        response = self.api_client.get(
+            f"{URL}/leaderboard?order=voters&limit=2"
+        )
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row["rank"], row["restaurant_id"]) for row in data],
+            [(1, self.restaurant_2.pk), (2, self.restaurant_1.pk)]
+        )
+
+    def test_leaderboard_ties_share_rank(self):
+        self.api_client.post(f"{URL}/{self.restaurant_1.pk}/vote")
+        self.api_client.post(f"{URL}/{self.restaurant_2.pk}/vote")
+
+        response = self.api_client.get(f"{URL}/leaderboard")
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual([row["rank"] for row in data], [1, 1])
+
+        response = self.api_client.get(f"{URL}/leaderboard?limit=0")
+        self.assertStatusCode(response, status.HTTP_400_BAD_REQUEST)
+
+        response = self.api_client.get(f"{URL}/leaderboard?order=name")
+        self.assertStatusCode(response, status.HTTP_400_BAD_REQUEST)
+
+    def test_history(self):
+        votes = [
+            # (date, restaurant, user, count)
+            (date(2024, 3, 1), self.restaurant_1, self.user, 1),
+            (date(2024, 3, 1), self.restaurant_2, self.user, 2),
+            (date(2024, 3, 2), self.restaurant_1, self.user, 1),
+            (date(2024, 3, 2), self.restaurant_1, self.user_2, 1),
+            (date(2024, 3, 2), self.restaurant_3, self.user_3, 5),
+            (date(2024, 3, 4), self.restaurant_3, self.user, 1),
+            (date(2024, 3, 4), self.restaurant_2, self.user, 1),
+            # outside the range
+            (date(2024, 3, 5), self.restaurant_3, self.user, 3),
+        ]
+        for vote_date, restaurant, user, count in votes:
+            RestaurantVoteFactory(
+                profile=user.profile,
+                restaurant=restaurant,
+                date=vote_date,
+                count=count,
+            )
+
+        with self.assertNumQueries(2):
+            response = self.api_client.get(
+                f"{URL}/history?start=2024-03-01&end=2024-03-04"
+            )
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+
+        self.assertEqual(
+            [
+                (winner["date"], winner["restaurant_id"])
+                for winner in data["winners"]
+            ],
+            [
+                ("2024-03-01", self.restaurant_2.pk),
+                ("2024-03-02", self.restaurant_3.pk),
+                ("2024-03-04", self.restaurant_2.pk),
+                ("2024-03-04", self.restaurant_3.pk),
+            ]
+        )
+        self.assertEqual(
+            [
+                (total["restaurant_id"], total["total_votes"])
+                for total in data["totals"]
+            ],
+            [
+                (self.restaurant_3.pk, 3.25),
+                (self.restaurant_1.pk, 3.0),
+                (self.restaurant_2.pk, 2.5),
+            ]
+        )
+
+        # ranking voters first makes restaurant_1 win 2024-03-02 instead
+        response = self.api_client.get(
+            f"{URL}/history?start=2024-03-02&end=2024-03-02&order=voters"
+        )
+        data = self.assertStatusCode(response, status.HTTP_200_OK)
+        self.assertEqual(len(data["winners"]), 1)
+        self.assertEqual(
+            data["winners"][0]["restaurant_id"], self.restaurant_1.pk
+        )
+
+    def test_history_invalid_range(self):
+        response = self.api_client.get(
+            f"{URL}/history?start=2024-03-02&end=2024-03-01"
+        )
+        self.assertStatusCode(response, status.HTTP_400_BAD_REQUEST)
+
+        response = self.api_client.get(
+            f"{URL}/history?start=2023-01-01&end=2024-03-01"
+        )
+        self.assertStatusCode(response, status.HTTP_400_BAD_REQUEST)
+
     def test_most_voted_restaurant_from_past_date(self):
+        # totals follow from the count: 1 + 0.5 + 0.25 * (count - 2)
         RestaurantVoteFactory(
             profile=self.user.profile,
             restaurant=self.restaurant_1,
             date=date(2024, 2, 1),
-            total=15
+            count=56
         )
         RestaurantVoteFactory(
             profile=self.user.profile,
             restaurant=self.restaurant_2,
             date=date(2024, 2, 2),
-            total=10
+            count=36
         )
 
         response = self.api_client.get(f"{URL}/most_voted?date=2024-02-01")
@@ -424,6 +748,31 @@ class RestaurantTests(BaseTestCase):
         with freeze_time("2024-09-06 00:00:01"):
             check_and_run_task(timezone.now())
 
+    def test_daily_votes_reset_lazily(self):
+        """
+        a new day starts from the full daily votes without any reset task
+        """
+        with freeze_time("2024-09-05 12:00:00"):
+            for _ in range(10):
+                self.api_client.post(f"{URL}/{self.restaurant_1.pk}/vote")
+            response = self.api_client.post(
+                f"{URL}/{self.restaurant_1.pk}/vote"
+            )
+            self.assertStatusCode(response, status.HTTP_400_BAD_REQUEST)
+
+        with freeze_time("2024-09-06 08:00:00"):
+            self.user.refresh_from_db()
+            self.assertEqual(self.user.profile.get_daily_votes(), 10)
+
+            response = self.api_client.post(
+                f"{URL}/{self.restaurant_1.pk}/vote"
+            )
+            data = self.assertStatusCode(response, status.HTTP_200_OK)
+            self.assertEqual(data["profile"]["daily_votes"], 9)
+
+        self.user.profile.refresh_from_db()
+        self.assertEqual(self.user.profile.votes_date, date(2024, 9, 6))
+
     def is_task_due(self, current_time):
         return (
             self.periodic_task.schedule.now() == current_time
@@ -0,0 +1,46 @@
+from decimal import Decimal
+
+from django.db import connection
+
+from apps.authentication.tests.factory.user import UserFactory
+from apps.restaurants import scoring
+from apps.restaurants.models import RestaurantVote
+from apps.restaurants.tests.factory.restaurant import RestaurantVoteFactory
+from apps.utils.tests.cases import BaseTestCase
+
+
+class ScoringTests(BaseTestCase):
+    """
+    The Python, expression and SQL scores agree for every count
+    """
+
+    COUNTS = range(0, 12)
+
+    def test_score(self):
+        self.assertEqual(
+            [scoring.score(count) for count in range(0, 6)],
+            [
+                Decimal("0"),
+                Decimal("1"),
+                Decimal("1.5"),
+                Decimal("1.75"),
+                Decimal("2"),
+                Decimal("2.25"),
+            ]
+        )
+
+    def test_generated_total(self):
+        profile = UserFactory().profile
+        for count in self.COUNTS:
+            RestaurantVoteFactory(profile=profile, count=count)
+
+        for count, total in RestaurantVote.objects.values_list(
+            "count", "total"
+        ):
+            self.assertEqual(total, scoring.score(count))
+
+    def test_score_sql(self):
+        with connection.cursor() as cursor:
+            for count in self.COUNTS:
+                cursor.execute(f"SELECT {scoring.score_sql(str(count))}")
+                self.assertEqual(cursor.fetchone()[0], scoring.score(count))
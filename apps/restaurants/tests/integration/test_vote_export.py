@@ -0,0 +1,139 @@
+import csv
+import json
+
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework import status
+
+from apps.authentication.tests.factory.user import UserFactory
+from apps.restaurants import export
+from apps.restaurants.tests.factory.restaurant import (
+    RestaurantFactory,
+    RestaurantVoteFactory
+)
+from apps.utils.tests.cases import BaseTestCase
+
+
+URL = "/api/restaurants/votes/export"
+
+
+class VoteExportTests(BaseTestCase):
+    """
+    Tests for the streamed vote export endpoint and command
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = UserFactory()
+        restaurant = RestaurantFactory(name="Maxines, Bar")
+        self.votes = [
+            RestaurantVoteFactory(
+                profile=self.user.profile,
+                restaurant=restaurant,
+                date=date(2024, 2, day),
+                count=day
+            )
+            for day in (1, 2, 3)
+        ]
+
+    def export(self, **params):
+        self.force_login(UserFactory(is_staff=True))
+        response = self.api_client.get(URL, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_staff_only(self):
+        self.force_login(self.user)
+        response = self.api_client.get(
+            URL, {"start": "2024-02-01", "end": "2024-02-03"}
+        )
+        self.assertStatusCode(response, status.HTTP_403_FORBIDDEN)
+
+    def test_csv(self):
+        response, content = self.export(start="2024-02-02", end="2024-02-03")
+
+        self.assertEqual(response.headers["Content-Type"], "text/csv")
+        self.assertEqual(
+            response.headers["Content-Disposition"],
+            'attachment; filename="votes-2024-02-02-2024-02-03.csv"'
+        )
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual(
+            [int(row["id"]) for row in rows],
+            [vote.pk for vote in self.votes[1:]]
+        )
+        self.assertEqual(rows[0]["restaurant_name"], "Maxines, Bar")
+        self.assertEqual(rows[0]["date"], "2024-02-02")
+        self.assertEqual(rows[0]["count"], "2")
+        self.assertEqual(rows[0]["total"], "1.50")
+
+    def test_csv_formulas_escaped(self):
+        RestaurantVoteFactory(
+            profile=self.user.profile,
+            restaurant=RestaurantFactory(name="=HYPERLINK(\"x\")"),
+            date=date(2024, 2, 4)
+        )
+
+        response, content = self.export(start="2024-02-04", end="2024-02-04")
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual(rows[0]["restaurant_name"], "'=HYPERLINK(\"x\")")
+
+        # only in CSV, ndjson keeps the name
+        response, content = self.export(
+            start="2024-02-04", end="2024-02-04", type="ndjson"
+        )
+        self.assertEqual(
+            json.loads(content)["restaurant_name"], "=HYPERLINK(\"x\")"
+        )
+
+    def test_ndjson(self):
+        response, content = self.export(
+            start="2024-02-01", end="2024-02-01", type="ndjson"
+        )
+
+        self.assertEqual(
+            response.headers["Content-Type"], "application/x-ndjson"
+        )
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["profile_id"], self.user.profile.pk)
+        self.assertEqual(rows[0]["total"], 1.0)
+
+    def test_cursor_in_transaction(self):
+        """
+        the cursor is read in an atomic block, so it is not declared WITH
+        HOLD and materialized before the first chunk
+        """
+        with CaptureQueriesContext(connection) as queries:
+            votes = list(export.rows(date(2024, 2, 1), date(2024, 2, 3)))
+        self.assertEqual(len(votes), 3)
+
+        statements = [query["sql"] for query in queries.captured_queries]
+        self.assertTrue(statements[0].startswith("SAVEPOINT"), statements)
+        self.assertIn("restaurants_restaurantvote", statements[1])
+        self.assertTrue(
+            statements[-1].startswith("RELEASE SAVEPOINT"), statements
+        )
+
+    def test_invalid_range(self):
+        self.force_login(UserFactory(is_staff=True))
+        response = self.api_client.get(
+            URL, {"start": "2024-02-03", "end": "2024-02-01"}
+        )
+        self.assertStatusCode(response, status.HTTP_400_BAD_REQUEST)
+
+    def test_command(self):
+        out = StringIO()
+        call_command(
+            "export_votes", "2024-02-01", "2024-02-03",
+            "--chunk-size", "1", stdout=out
+        )
+
+        rows = list(csv.DictReader(StringIO(out.getvalue())))
+        self.assertEqual(len(rows), 3)
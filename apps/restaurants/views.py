@@ -1,31 +1,54 @@
+import io
+
+from datetime import date as Date
+from functools import partial
+from typing import List
+
 from django.db import transaction
-from django.db.models import (
-    Case, Count, F, FloatField, Q, Subquery, Sum, When
-)
-from django.utils.timezone import now
+from django.http import StreamingHttpResponse
+from django.utils.timezone import localdate
 
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiResponse, extend_schema
 from rest_framework import viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import (
+    IsAdminUser,
     IsAuthenticated,
     IsAuthenticatedOrReadOnly
 )
 from rest_framework.request import Request
 from rest_framework.response import Response
 
+from apps.restaurants import caching, export, imports
 from apps.restaurants.exceptions import (
     RestaurantUnvoteException,
     RestaurantVoteException
 )
+from apps.restaurants.leaderboard import get_leaderboard
 from apps.restaurants.models import Restaurant, RestaurantVote
 from apps.restaurants.permissions import IsRestaurantCreatorOrAdmin
 from apps.restaurants.serializers import (
+    BulkVoteSerializer,
+    DateRangeSerializer,
     DateSerializer,
+    LeaderboardSerializer,
+    RestaurantHistorySerializer,
+    RestaurantImportReportSerializer,
+    RestaurantImportSerializer,
     RestaurantMostVotedSerializer,
+    RestaurantRankSerializer,
     RestaurantSerializer,
-    RestaurantVoteSerializer
+    RestaurantVoteSerializer,
+    SearchSerializer,
+    VoteExportSerializer
+)
+from apps.utils.pagination import (
+    OptionalKeysetPagination,
+    RecentKeysetPagination
 )
+from apps.utils.serializers import flat_representation, source_fields
 
 
 @extend_schema(tags=["restaurants"])
@@ -33,10 +56,69 @@ class RestaurantViewSet(viewsets.ModelViewSet):
 
     queryset = Restaurant.objects.all()
     serializer_class = RestaurantSerializer
+    pagination_class = OptionalKeysetPagination
+    lookup_value_regex = r"\d+"
     permission_classes = [
         IsAuthenticatedOrReadOnly, IsRestaurantCreatorOrAdmin
     ]
 
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        version, last_modified = caching.list_state()
+        render = partial(self.list_values, request)
+        return caching.cached_response(
+            request,
+            caching.list_key(version, request),
+            lambda: (render(), last_modified),
+        )
+
+    def list_values(self, request: Request) -> Response:
+        """
+        The list page from .values() rows, without model instances or a
+        serializer per response.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *source_fields(self.serializer_class)
+        )
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(
+                flat_representation(self.serializer_class, queryset)
+            )
+        return self.get_paginated_response(
+            flat_representation(self.serializer_class, page)
+        )
+
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        def render():
+            instance = self.get_object()
+            serializer = self.get_serializer(instance)
+            return Response(serializer.data), instance.modified
+
+        return caching.cached_response(
+            request, caching.detail_key(int(kwargs["pk"])), render
+        )
+
+    def today(self) -> Date:
+        """
+        Today in the user's timezone, or in TIME_ZONE when anonymous.
+        """
+        if self.request.user.is_authenticated:
+            return self.request.user.profile.today()
+        return localdate()
+
+    def record(self, votes: List[RestaurantVote]):
+        """
+        Once committed, apply the votes to the leaderboard and expire the
+        cached most voted restaurants for their date.
+        """
+        leaderboard = get_leaderboard()
+
+        def apply():
+            leaderboard.record(votes)
+            caching.bump_most_voted(votes[0].date)
+
+        transaction.on_commit(apply)
+
     @extend_schema(
         responses=RestaurantVoteSerializer,
     )
@@ -45,44 +127,19 @@ class RestaurantViewSet(viewsets.ModelViewSet):
         methods=["post"],
         permission_classes=[IsAuthenticated]
     )
-    @transaction.atomic
     def vote(self, request: Request, pk=None) -> Response:
         """
         Add vote
         """
-        user_daily_votes = request.user.profile.daily_votes
-        if user_daily_votes == 0:
+        vote = RestaurantVote.objects.cast(
+            request.user.profile, pk, self.today()
+        )
+        if vote is None:
+            # 404 when the restaurant does not exist
+            self.get_object()
             raise RestaurantVoteException()
 
-        user_vote_details = {
-            "profile": request.user.profile,
-            "date": now().date(),
-            "restaurant": self.get_object()
-        }
-
-        queryset = RestaurantVote.objects.filter(Q(**user_vote_details))
-        vote = queryset.first()
-        if vote:
-            update_details = {
-                "count": F("count") + 1,
-                "total": Case(
-                    When(count=0, then=F('total') + RestaurantVote.FIRST_VOTE),
-                    When(count=1, then=F('total') + RestaurantVote.SECOND_VOTE),
-                    default=F('total') + RestaurantVote.DEFAULT_VOTE,
-                    output_field=FloatField()
-                )
-            }
-
-            queryset.update(**update_details)
-            # update vote with latest changes
-            vote.refresh_from_db()
-        else:
-            vote = RestaurantVote.objects.create(
-                **user_vote_details, total=RestaurantVote.FIRST_VOTE
-            )
-
-        request.user.profile.decrease_daily_votes()
-
+        self.record([vote])
         return Response(RestaurantVoteSerializer(vote).data)
 
     @extend_schema(
@@ -93,41 +150,164 @@ class RestaurantViewSet(viewsets.ModelViewSet):
         methods=["post"],
         permission_classes=[IsAuthenticated]
     )
-    @transaction.atomic
     def unvote(self, request: Request, pk=None) -> Response:
         """
         Remove/subtract vote
         """
+        vote = RestaurantVote.objects.retract(
+            request.user.profile, pk, self.today()
+        )
+        if vote is None:
+            # 404 when the restaurant does not exist
+            self.get_object()
+            raise RestaurantUnvoteException()
 
-        user_vote_details = {
-            "profile": request.user.profile,
-            "date": now().date(),
-            "restaurant": self.get_object()
-        }
-
-        queryset = RestaurantVote.objects.filter(Q(**user_vote_details))
-        vote = queryset.first()
+        self.record([vote])
+        return Response(RestaurantVoteSerializer(vote).data)
 
-        if not vote or vote.count == 0:
-            raise RestaurantUnvoteException()
+    @extend_schema(
+        request=BulkVoteSerializer,
+        responses=RestaurantVoteSerializer(many=True),
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="votes",
+        permission_classes=[IsAuthenticated]
+    )
+    def bulk_vote(self, request: Request) -> Response:
+        """
+        Add several votes across restaurants at once. Either every vote is
+        cast or none is.
+        """
+        serializer = BulkVoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        counts = serializer.get_counts()
 
-        update_details = {
-            "count": F("count") - 1,
-            "total": Case(
-                When(count=2, then=F('total') - RestaurantVote.SECOND_VOTE),
-                When(count__gt=2, then=F('total') - RestaurantVote.DEFAULT_VOTE),  # noqa: E501
-                default=0,
-                output_field=FloatField()
+        votes = RestaurantVote.objects.cast_many(
+            request.user.profile, counts, self.today()
+        )
+        if not votes:
+            missing = counts.keys() - set(
+                Restaurant.objects.filter(id__in=counts.keys())
+                .values_list("id", flat=True)
             )
-        }
+            if missing:
+                raise NotFound(f"Restaurants not found: {sorted(missing)}")
+            raise RestaurantVoteException()
 
-        queryset.update(**update_details)
+        self.record(votes)
+        return Response(RestaurantVoteSerializer(votes, many=True).data)
 
-        request.user.profile.increase_daily_votes()
+    @extend_schema(
+        responses=RestaurantVoteSerializer(many=True),
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="votes/history",
+        permission_classes=[IsAuthenticated],
+        pagination_class=RecentKeysetPagination,
+        filter_backends=[]
+    )
+    def vote_history(self, request: Request) -> Response:
+        """
+        Get the user's votes, newest first.
+        """
+        votes = (
+            RestaurantVote.objects
+            .filter(profile=request.user.profile)
+            .select_related("profile", "restaurant")
+        )
+        page = self.paginate_queryset(votes)
+        return self.get_paginated_response(
+            RestaurantVoteSerializer(page, many=True).data
+        )
 
-        # update vote with latest changes
-        vote.refresh_from_db()
-        return Response(RestaurantVoteSerializer(vote).data)
+    @extend_schema(
+        parameters=[VoteExportSerializer],
+        responses=OpenApiResponse(
+            OpenApiTypes.STR,
+            description="CSV or newline delimited JSON, one vote per line"
+        ),
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="votes/export",
+        permission_classes=[IsAdminUser],
+        pagination_class=None,
+        filter_backends=[]
+    )
+    def vote_export(self, request: Request) -> StreamingHttpResponse:
+        """
+        Stream every vote dated from start to end. Staff only.
+        """
+        query = VoteExportSerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        start, end, file_format = (
+            query.validated_data[field] for field in ("start", "end", "type")
+        )
+
+        response = StreamingHttpResponse(
+            export.lines(start, end, file_format),
+            content_type=export.CONTENT_TYPES[file_format],
+        )
+        response.headers["Content-Disposition"] = (
+            f'attachment; filename="votes-{start}-{end}.{file_format}"'
+        )
+        return response
+
+    @extend_schema(
+        request=RestaurantImportSerializer,
+        responses=RestaurantImportReportSerializer,
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        permission_classes=[IsAdminUser],
+        serializer_class=RestaurantImportSerializer
+    )
+    def bulk_import(self, request: Request) -> Response:
+        """
+        Create restaurants from an uploaded file of names, skipping names
+        that already exist in any case. Staff only.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        file = io.TextIOWrapper(
+            serializer.validated_data["file"], encoding="utf-8", newline=""
+        )
+        report = Restaurant.objects.import_names(
+            imports.names(file, serializer.validated_data["type"]),
+            request.user.profile
+        )
+        return Response(RestaurantImportReportSerializer(report).data)
+
+    @extend_schema(
+        parameters=[SearchSerializer],
+        responses=RestaurantSerializer(many=True),
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        pagination_class=None,
+        filter_backends=[]
+    )
+    def search(self, request: Request) -> Response:
+        """
+        Get the first restaurants whose name starts with q, for typeahead.
+        """
+        query = SearchSerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        restaurants = Restaurant.objects.search(query.validated_data["q"])
+        serializer = RestaurantSerializer(
+            restaurants[:query.validated_data["limit"]], many=True
+        )
+        return Response(serializer.data)
 
     @extend_schema(
         responses=RestaurantMostVotedSerializer(many=True),
@@ -147,46 +327,61 @@ class RestaurantViewSet(viewsets.ModelViewSet):
             serializer.is_valid(raise_exception=True)
             date_to_query = serializer.validated_data["date"]
         else:
-            date_to_query = now().date()
-
-        queryset = RestaurantVote.objects.filter(date=date_to_query)
-
-        # Subquery that gets the most votes and voters for a restaurant
-        most_voted_and_voters_count_subquery = (
-            queryset.
-            values('restaurant')  # group by restaurants
-            .annotate(
-                total_votes=Sum('total'),
-                total_voter_count=Count('profile'),
-                restaurant_id=F("restaurant_id"),
-                restaurant_name=F("restaurant__name")
-            )
-        )
+            date_to_query = self.today()
 
-        most_voted_restaurants = (
-            most_voted_and_voters_count_subquery.filter(
-                total_voter_count=Subquery(
-                    most_voted_and_voters_count_subquery
-                    .order_by('-total_voter_count')
-                    .values('total_voter_count')[:1]
-                ),
-                total_votes=Subquery(
-                    most_voted_and_voters_count_subquery
-                    .order_by('-total_votes')
-                    .values('total_votes')[:1]
-                )
-            )
-            .values(
-                "restaurant_id",
-                "restaurant_name",
-                "total_votes",
-                "total_voter_count"
+        return Response(flat_representation(
+            RestaurantMostVotedSerializer,
+            caching.most_voted(date_to_query, get_leaderboard().most_voted)
+        ))
+
+    @extend_schema(
+        parameters=[LeaderboardSerializer],
+        responses=RestaurantRankSerializer(many=True),
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        pagination_class=None
+    )
+    def leaderboard(self, request):
+        """
+        Get the top ranked restaurants for today or the passed date.
+        """
+        query = LeaderboardSerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        return Response(flat_representation(
+            RestaurantRankSerializer,
+            get_leaderboard().ranking(
+                query.validated_data.get("date", self.today()),
+                query.validated_data["limit"],
+                query.validated_data["order"],
             )
-        )
+        ))
 
-        serializer = RestaurantMostVotedSerializer(
-            most_voted_restaurants,
-            many=True
+    @extend_schema(
+        parameters=[DateRangeSerializer],
+        responses=RestaurantHistorySerializer,
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        pagination_class=None
+    )
+    def history(self, request):
+        """
+        Get each day's winner(s) and every restaurant's totals between the
+        start and end dates.
+        """
+        query = DateRangeSerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        serializer = RestaurantHistorySerializer(
+            get_leaderboard().history(
+                query.validated_data["start"],
+                query.validated_data["end"],
+                query.validated_data["order"],
+            )
         )
         return Response(serializer.data)
 
@@ -1,11 +1,57 @@
+"""
+Constance config reads through a process-local cache.
+
+Each process keeps the values it read for CONFIG_CACHE_TIMEOUT seconds.
+An update made through constance, e.g. in the admin, is published on a
+Redis channel once committed, and a listener thread in every process
+drops its copies as soon as the message arrives, so the timeout only
+bounds how stale a value gets if a message is lost.
+"""
+import logging
+import os
+import threading
+import time
+
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.dispatch import receiver
+
 from constance import config
+from constance.signals import config_updated
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+
+logger = logging.getLogger(__name__)
+
+CONFIG_CHANNEL = "constance:updated"
+
+# Seconds the listener waits before subscribing again after losing Redis
+RESUBSCRIBE_WAIT = 1
+
+# key: (value, time.monotonic() it expires at)
+_values: Dict[str, Tuple[Any, float]] = {}
+_listener_pid: Optional[int] = None
+_listener_lock = threading.Lock()
 
 
 def get_config_value(key):
     """
     get config settings
     """
-    return getattr(config, key)
+    timeout = settings.CONFIG_CACHE_TIMEOUT
+    if not timeout:
+        return getattr(config, key)
+
+    listen_for_updates()
+    now = time.monotonic()
+    cached = _values.get(key)
+    if cached is None or cached[1] <= now:
+        cached = (getattr(config, key), now + timeout)
+        _values[key] = cached
+    return cached[0]
 
 
 def set_config_value(key, value):
@@ -13,3 +59,55 @@ def set_config_value(key, value):
     update config settings
     """
     setattr(config, key, value)
+
+
+def clear_config_cache():
+    """
+    Drop this process's copies of the config values.
+    """
+    _values.clear()
+
+
+def listen_for_updates():
+    """
+    Start this process's listener for published updates, once per process
+    so forked workers start their own.
+    """
+    global _listener_pid
+    if _listener_pid == os.getpid():
+        return
+    with _listener_lock:
+        if _listener_pid != os.getpid():
+            _listener_pid = os.getpid()
+            threading.Thread(
+                target=_listen, name="config-updates", daemon=True
+            ).start()
+
+
+def _listen():
+    while True:
+        try:
+            pubsub = get_redis_connection("default").pubsub(
+                ignore_subscribe_messages=True
+            )
+            pubsub.subscribe(CONFIG_CHANNEL)
+            # updates may have been missed while unsubscribed
+            clear_config_cache()
+            for message in pubsub.listen():
+                clear_config_cache()
+        except RedisError:
+            logger.warning("Config update listener lost Redis, resubscribing")
+            time.sleep(RESUBSCRIBE_WAIT)
+
+
+@receiver(config_updated)
+def publish_config_update(sender, key, **kwargs):
+    """
+    Drop the cached values here at once and in every process once the
+    update is committed. The key is published for information only, as
+    backends may have prefixed it.
+    """
+    clear_config_cache()
+    transaction.on_commit(
+        lambda: get_redis_connection("default").publish(CONFIG_CHANNEL, key)
+    )
@@ -0,0 +1,144 @@
+from typing import List, Optional
+
+from django.db import connection
+from django.db.models import QuerySet
+
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+APPROXIMATE_COUNT_SQL = """
+SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass
+"""
+
+
+def approximate_count(queryset: QuerySet) -> Optional[int]:
+    """
+    Rows in the queryset's table as last estimated by the planner, without
+    a COUNT(*) scan. None when the table was never analyzed.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            APPROXIMATE_COUNT_SQL,
+            [connection.ops.quote_name(queryset.model._meta.db_table)]
+        )
+        row = cursor.fetchone()
+    return row[0] if row and row[0] >= 0 else None
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination on an indexed, unique key, so every page is an index
+    range scan and page N costs the same as page 1.
+
+    That holds for the default id ordering only. With another one, e.g.
+    ``?ordering=name``, the cursor keys on ordering[0] alone, as in
+    CursorPagination, skipping the rows that share its value by offset:
+    pages are then as cheap as filtering and sorting on that field, not a
+    primary key scan.
+
+    There is no total count. ``?count=approximate`` adds the table's row
+    estimate from pg_class.reltuples, which ignores any filters.
+    """
+
+    ordering = "id"
+    page_size_query_param = "limit"
+    max_page_size = 1000
+    count_query_param = "count"
+    count_query_description = (
+        "Set to 'approximate' to include the estimated number of rows."
+    )
+
+    def get_ordering(self, request, queryset, view) -> tuple:
+        """
+        The requested ordering with id to break ties, so rows sharing e.g.
+        a created time keep the same order from page to page.
+        """
+        ordering = tuple(super().get_ordering(request, queryset, view))
+        if not {"id", "-id", "pk", "-pk"} & set(ordering):
+            ordering += ("id",)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None) -> List:
+        self.count = None
+        if request.query_params.get(self.count_query_param) == "approximate":
+            self.count = approximate_count(queryset)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data) -> Response:
+        response = super().get_paginated_response(data)
+        if self.count is not None:
+            response.data["count"] = self.count
+        return response
+
+    def get_paginated_response_schema(self, schema) -> dict:
+        schema = super().get_paginated_response_schema(schema)
+        schema["properties"]["count"] = {"type": "integer", "example": 123}
+        return schema
+
+    def get_schema_operation_parameters(self, view) -> List[dict]:
+        return super().get_schema_operation_parameters(view) + [{
+            "name": self.count_query_param,
+            "required": False,
+            "in": "query",
+            "description": self.count_query_description,
+            "schema": {"type": "string", "enum": ["approximate"]},
+        }]
+
+
+class RecentKeysetPagination(KeysetPagination):
+    """
+    KeysetPagination from the newest row back.
+    """
+
+    ordering = "-id"
+
+
+class OptionalKeysetPagination(BasePagination):
+    """
+    DEFAULT_PAGINATION_CLASS, or KeysetPagination for requests that ask
+    for it with ``?pagination=cursor``, so listings keep their offset
+    pages and count for existing clients.
+    """
+
+    query_param = "pagination"
+    query_description = (
+        "Set to 'cursor' for keyset pages without a total count."
+    )
+    keyset_class = KeysetPagination
+
+    def __init__(self):
+        self.paginator = api_settings.DEFAULT_PAGINATION_CLASS()
+
+    @property
+    def display_page_controls(self) -> bool:
+        return getattr(self.paginator, "display_page_controls", False)
+
+    def paginate_queryset(self, queryset, request, view=None) -> List:
+        if request.query_params.get(self.query_param) == "cursor":
+            self.paginator = self.keyset_class()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data) -> Response:
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema) -> dict:
+        return self.paginator.get_paginated_response_schema(schema)
+
+    def to_html(self) -> str:
+        return self.paginator.to_html()
+
+    def get_schema_operation_parameters(self, view) -> List[dict]:
+        parameters = {
+            parameter["name"]: parameter
+            for paginator in (self.paginator, self.keyset_class())
+            for parameter in paginator.get_schema_operation_parameters(view)
+        }
+        return list(parameters.values()) + [{
+            "name": self.query_param,
+            "required": False,
+            "in": "query",
+            "description": self.query_description,
+            "schema": {"type": "string", "enum": ["cursor"]},
+        }]
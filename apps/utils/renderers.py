@@ -0,0 +1,32 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson when it is installed. Indented output,
+    e.g. for the browsable API, still goes through the json module.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if orjson is None or data is None or indent:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # dates go through the encoder to be formatted as JSONRenderer does,
+        # and keys need not be strings, e.g. ListField errors by index
+        ret = orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
+        # like JSONRenderer, escape the separators JavaScript rejects
+        return ret.replace(
+            "\u2028".encode(), b"\\u2028"
+        ).replace(
+            "\u2029".encode(), b"\\u2029"
+        )
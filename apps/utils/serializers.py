@@ -0,0 +1,45 @@
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Tuple, Type
+
+from rest_framework import serializers
+
+
+@lru_cache(maxsize=None)
+def flat_fields(
+    serializer_class: Type[serializers.Serializer]
+) -> List[Tuple[str, str, Callable]]:
+    """
+    Name, source and to_representation of each readable field of a flat
+    serializer, bound once per class instead of once per response.
+    """
+    return [
+        (name, field.source, field.to_representation)
+        for name, field in serializer_class().fields.items()
+        if not field.write_only
+    ]
+
+
+def source_fields(serializer_class: Type[serializers.Serializer]) -> List:
+    """
+    The sources a flat serializer reads, e.g. to pass to .values().
+    """
+    return [source for _, source, _ in flat_fields(serializer_class)]
+
+
+def flat_representation(
+    serializer_class: Type[serializers.Serializer],
+    rows: Iterable[Dict]
+) -> List[Dict]:
+    """
+    What serializer_class(rows, many=True).data returns for dict rows, e.g.
+    from .values(), without building a serializer for the response. Only
+    for read-only serializers without nesting or dotted sources.
+    """
+    fields = flat_fields(serializer_class)
+    return [
+        {
+            name: None if row[source] is None else represent(row[source])
+            for name, source, represent in fields
+        }
+        for row in rows
+    ]
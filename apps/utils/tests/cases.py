@@ -1,12 +1,16 @@
-from typing import Dict
+from typing import Callable, Dict
 
 
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 
 from rest_framework.response import Response
 from rest_framework.test import APIClient
 
 from apps.authentication.models import User
+from apps.utils.helper import clear_config_cache
 
 
 class BaseCase:
@@ -15,6 +19,9 @@ class BaseCase:
         self.api_client = APIClient()
         # http client should be used for testing regular webpages
         self.http_client = Client()
+        # cached values outlive the test database between runs
+        cache.clear()
+        clear_config_cache()
 
     def force_login(self, user: User):
         """
@@ -42,3 +49,24 @@ class BaseTestCase(BaseCase, TestCase):
         """
         self.assertEqual(response.status_code, status_code)
         return response.json()
+
+    def assertQueriesConstant(
+        self,
+        request: Callable[[], Response],
+        grow: Callable[[], None]
+    ):
+        """
+        Assert request makes as many queries after grow added rows as
+        before, i.e. the response has no per-row queries.
+        """
+        with CaptureQueriesContext(connection) as before:
+            request()
+        grow()
+        with CaptureQueriesContext(connection) as after:
+            request()
+
+        self.assertEqual(
+            len(after),
+            len(before),
+            "\n".join(query["sql"] for query in after.captured_queries)
+        )
@@ -0,0 +1,70 @@
+import time
+
+from constance import config
+from django.test import override_settings
+from django_redis import get_redis_connection
+
+from apps.utils import helper
+from apps.utils.helper import get_config_value, set_config_value
+from apps.utils.tests.cases import BaseTestCase
+
+
+class ConfigCacheTests(BaseTestCase):
+    """
+    Tests for the process-local constance cache and its invalidation
+    """
+
+    def setUp(self):
+        super().setUp()
+        # store the default, which the first read does
+        getattr(config, "USER_DAILY_VOTES")
+
+    def test_reads_cached(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(get_config_value("USER_DAILY_VOTES"), 10)
+            self.assertEqual(get_config_value("USER_DAILY_VOTES"), 10)
+
+    @override_settings(CONFIG_CACHE_TIMEOUT=0)
+    def test_disabled(self):
+        with self.assertNumQueries(2):
+            get_config_value("USER_DAILY_VOTES")
+            get_config_value("USER_DAILY_VOTES")
+
+    def test_update_published(self):
+        get_config_value("USER_DAILY_VOTES")
+        pubsub = get_redis_connection("default").pubsub(
+            ignore_subscribe_messages=True
+        )
+        pubsub.subscribe(helper.CONFIG_CHANNEL)
+
+        # as the constance admin does
+        with self.captureOnCommitCallbacks(execute=True):
+            setattr(config, "USER_DAILY_VOTES", 5)
+
+        self.assertEqual(get_config_value("USER_DAILY_VOTES"), 5)
+        deadline = time.monotonic() + 1
+        message = None
+        while message is None and time.monotonic() < deadline:
+            message = pubsub.get_message(timeout=0.1)
+        self.assertEqual(message["data"], b"USER_DAILY_VOTES")
+        pubsub.close()
+
+        set_config_value("USER_DAILY_VOTES", 10)
+
+    def test_other_process_update(self):
+        """
+        a key published by another process is dropped by the listener
+        """
+        get_config_value("USER_DAILY_VOTES")
+        self.assertIn("USER_DAILY_VOTES", helper._values)
+
+        connection = get_redis_connection("default")
+        deadline = time.monotonic() + 1
+        while (
+            "USER_DAILY_VOTES" in helper._values
+            and time.monotonic() < deadline
+        ):
+            connection.publish(helper.CONFIG_CHANNEL, "USER_DAILY_VOTES")
+            time.sleep(0.01)
+
+        self.assertNotIn("USER_DAILY_VOTES", helper._values)
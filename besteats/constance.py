@@ -16,3 +16,7 @@ CONSTANCE_CONFIG = {
         int
     )
 }
+
+# Seconds each process keeps the config values it read. Updates are also
+# published over Redis, so this only bounds staleness if one is missed.
+CONFIG_CACHE_TIMEOUT = 10
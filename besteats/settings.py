@@ -115,7 +115,7 @@ REDIS_URL = os.environ.get('REDIS_URL', "")
 CACHES = {
     'default': {
         'BACKEND': 'django_redis.cache.RedisCache',
-        'LOCATION': f"{REDIS_URL}"
+        'LOCATION': f"redis://{REDIS_URL}/0"
     },
 }
 
@@ -127,19 +127,70 @@ CELERY_RESULT_BACKEND = f"redis://{REDIS_URL}/2"
 CELERY_RESULT_EXPIRES = 3600
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 
+# Daily votes reset lazily on each user's first vote of the day in their
+# timezone, the hourly wave only cleans up the zones that passed midnight.
 CELERY_BEAT_SCHEDULE = {
-    "Reset User Daily Votes": {
-        "task": "apps.profiles.tasks.reset_daily_votes_for_all_profles",
-        "schedule": crontab(hour=0, minute=0),
-    }
+    "Reset Daily Votes After Midnight": {
+        "task": "apps.profiles.tasks.reset_daily_votes_after_midnight",
+        "schedule": crontab(minute=15),
+    },
+    "Reconcile Leaderboard": {
+        "task": "apps.restaurants.tasks.reconcile_leaderboard",
+        "schedule": crontab(minute="*/5"),
+    },
 }
 
+# Where most_voted reads the daily winners from. Use
+# "apps.restaurants.leaderboard.RedisLeaderboard" to serve them from Redis
+# sorted sets kept alongside the database.
+LEADERBOARD_BACKEND = os.environ.get(
+    "LEADERBOARD_BACKEND",
+    "apps.restaurants.leaderboard.DatabaseLeaderboard"
+)
+# Seconds a day's Redis leaderboard is kept after its last vote
+LEADERBOARD_REDIS_TIMEOUT = 60 * 60 * 48
+
+# Seconds a cached restaurant list or detail response is kept, writes
+# invalidate them earlier
+RESTAURANT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Seconds today's cached most_voted is kept, votes expire it earlier
+MOST_VOTED_CACHE_TIMEOUT = 60
+
+# Profiles the reset_daily_votes_for_all_profles cleanup commits at a time
+DAILY_VOTES_RESET_BATCH_SIZE = int(
+    os.environ.get("DAILY_VOTES_RESET_BATCH_SIZE", 1000)
+)
+
+# Seconds an authenticated user and profile are cached, 0 to always query
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get("AUTH_USER_CACHE_TIMEOUT", 60))
+
+# Votes fetched per round trip of the server-side cursor behind exports
+VOTE_EXPORT_CHUNK_SIZE = int(os.environ.get("VOTE_EXPORT_CHUNK_SIZE", 2000))
+
+# Where each user's remaining daily votes are kept. Use
+# "apps.profiles.quota.RedisQuota" to keep them in Redis keys expiring at
+# midnight instead of Profile.daily_votes.
+VOTE_QUOTA_BACKEND = os.environ.get(
+    "VOTE_QUOTA_BACKEND",
+    "apps.profiles.quota.DatabaseQuota"
+)
+
+# How JWT requests are authenticated. Use
+# "apps.authentication.authentication.StatelessJWTAuthentication" to build
+# the user from the token's claims without a query, checking only the
+# revocation list in Redis.
+JWT_AUTHENTICATION_CLASS = os.environ.get(
+    "JWT_AUTHENTICATION_CLASS",
+    "apps.authentication.authentication.ProfileJWTAuthentication"
+)
+
 # Django REST Framework configuration
 # Refer to: https://www.django-rest-framework.org/api-guide/settings/
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.authentication.authentication.ProfileTokenAuthentication",
+        JWT_AUTHENTICATION_CLASS,
     ],
     "DEFAULT_CONTENT_TYPE": "application/json",
     "DEFAULT_FILTER_BACKENDS": [
@@ -152,7 +203,7 @@ REST_FRAMEWORK = {
         "rest_framework.parsers.FormParser",
         "rest_framework.parsers.MultiPartParser",
     ],
-    "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
+    "DEFAULT_RENDERER_CLASSES": ["apps.utils.renderers.ORJSONRenderer"],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "EXCEPTION_HANDLER": "apps.utils.exceptions.custom_exception_handler",
     # Project-wide default page size, overriddable in ModelViewSet
@@ -177,6 +228,9 @@ REST_AUTH = {
     # "JWT_AUTH_COOKIE": "_auth",  # Name of access token cookie
     # "JWT_AUTH_REFRESH_COOKIE": "_refresh", # Name of refresh token cookie
     "JWT_AUTH_HTTPONLY": False,  # Makes sure refresh token is sent
+    "JWT_TOKEN_CLAIMS_SERIALIZER": (
+        "apps.authentication.serializers.ProfileTokenObtainPairSerializer"
+    ),
 }
 
 # django-allauth
@@ -192,6 +246,9 @@ SITE_ID = 1
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=24),
+    "TOKEN_REFRESH_SERIALIZER": (
+        "apps.authentication.serializers.ProfileTokenRefreshSerializer"
+    ),
 }
 
 if ENABLE_BROWSEABLE: